@@ -24,6 +24,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from repo_walk import iter_files
+
 # ═══════════════════════════════════════════════════════════════════════════
 # COLORS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -122,19 +124,14 @@ LIGHTER_ALTERNATIVES = {
 def get_file_sizes() -> list[dict]:
     """Get all component file sizes for analysis."""
     files = []
-    for ext in CODE_EXTS:
-        for fpath in sorted(ROOT.rglob(f"*{ext}")):
-            if any(part in SKIP_DIRS for part in fpath.parts):
-                continue
-            if not fpath.is_file():
-                continue
-            size = fpath.stat().st_size
-            rel = str(fpath.relative_to(ROOT))
-            files.append({
-                "path": rel,
-                "size": size,
-                "ext": ext,
-            })
+    for fpath in sorted(iter_files(ROOT, SKIP_DIRS, CODE_EXTS)):
+        size = fpath.stat().st_size
+        rel = str(fpath.relative_to(ROOT))
+        files.append({
+            "path": rel,
+            "size": size,
+            "ext": fpath.suffix,
+        })
     return sorted(files, key=lambda x: -x["size"])
 
 
@@ -158,43 +155,37 @@ def analyze_imports() -> dict[str, dict]:
         re.MULTILINE,
     )
 
-    for ext in CODE_EXTS:
-        for fpath in sorted(ROOT.rglob(f"*{ext}")):
-            if any(part in SKIP_DIRS for part in fpath.parts):
-                continue
-            if not fpath.is_file():
+    for fpath in sorted(iter_files(ROOT, SKIP_DIRS, CODE_EXTS)):
+        try:
+            content = fpath.read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            continue
+
+        rel = str(fpath.relative_to(ROOT))
+
+        for match in import_re.finditer(content):
+            pkg = match.group(1) or match.group(2)
+            if not pkg:
                 continue
 
-            try:
-                content = fpath.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
+            # Normalize to package root: @scope/pkg/subpath → @scope/pkg
+            if pkg.startswith("@"):
+                parts = pkg.split("/")
+                pkg = "/".join(parts[:2]) if len(parts) > 1 else parts[0]
+            else:
+                pkg = pkg.split("/")[0]
+
+            # Skip Next.js built-ins and React
+            if pkg in {"react", "react-dom", "next", "next/image", "next/link",
+                      "next/font", "next/navigation", "next/dynamic", "next/script",
+                      "next/headers", "next/server"}:
                 continue
 
-            rel = str(fpath.relative_to(ROOT))
-
-            for match in import_re.finditer(content):
-                pkg = match.group(1) or match.group(2)
-                if not pkg:
-                    continue
-
-                # Normalize to package root: @scope/pkg/subpath → @scope/pkg
-                if pkg.startswith("@"):
-                    parts = pkg.split("/")
-                    pkg = "/".join(parts[:2]) if len(parts) > 1 else parts[0]
-                else:
-                    pkg = pkg.split("/")[0]
-
-                # Skip Next.js built-ins and React
-                if pkg in {"react", "react-dom", "next", "next/image", "next/link",
-                          "next/font", "next/navigation", "next/dynamic", "next/script",
-                          "next/headers", "next/server"}:
-                    continue
-
-                if pkg not in import_map:
-                    import_map[pkg] = {"count": 0, "files": []}
-                import_map[pkg]["count"] += 1
-                if len(import_map[pkg]["files"]) < 10:
-                    import_map[pkg]["files"].append(rel)
+            if pkg not in import_map:
+                import_map[pkg] = {"count": 0, "files": []}
+            import_map[pkg]["count"] += 1
+            if len(import_map[pkg]["files"]) < 10:
+                import_map[pkg]["files"].append(rel)
 
     return import_map
 
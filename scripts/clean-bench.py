@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for clean.py's rewrite rules over this repo's own files.
+
+Times apply_tailwind_fixes per file (best of N rounds), and with --against
+runs the same corpus through another revision of clean.py: prints the
+per-file speedup and fails if any file's output or fix count differs.
+--tsc times clean.py's type check instead, cold and warm; --next-build times
+`next build` after each way clean.py can leave the build caches, --next-dev
+the first response of `next dev --turbo` (what `npm run dev` runs).
+
+--groups times each rule group (TAILWIND_PASSES entry, plus the lint fixes)
+where it sits in the pipeline. --golden checks the rules against
+clean-golden.json: real snippets from this repo with the output and fix
+counts recorded for them, and a px_to_tw table — any change in output, byte
+for byte, fails. --update-golden re-records the expected side after an
+intended rule change (--harvest also re-collects the snippets).
+--undo-stress runs UndoManager backups from many threads (--workers) over a
+temp tree and checks every blob against the original bytes.
+
+    python3 scripts/clean-bench.py                      ← time the working tree
+    python3 scripts/clean-bench.py --against HEAD~1     ← compare with a git revision
+    python3 scripts/clean-bench.py --ext .tsx .ts       ← choose the corpus
+    python3 scripts/clean-bench.py --tsc                ← tsc check, cold vs incremental
+    python3 scripts/clean-bench.py --next-build         ← next build after full vs targeted cache clears
+    python3 scripts/clean-bench.py --next-dev           ← same for next dev --turbo, first page load
+    python3 scripts/clean-bench.py --groups             ← time per rule group (min / mean / stddev)
+    python3 scripts/clean-bench.py --golden             ← check outputs against the golden corpus
+    python3 scripts/clean-bench.py --update-golden      ← re-record it (add --harvest to re-collect)
+    python3 scripts/clean-bench.py --undo-stress        ← concurrent undo backups, checked blob by blob
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+from repo_walk import iter_files
+
+SCRIPTS = Path(__file__).resolve().parent
+ROOT = SCRIPTS.parent
+# JSON rather than .tsx / .css files, so tsc, eslint and clean.py itself leave the snippets alone
+GOLDEN = SCRIPTS / "clean-golden.json"
+
+PX_SAMPLES: list[float] = [0, 0.5, 1, 1.5, 2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 16, 17, 18, 20, 22, 24, 25, 30, 33, 48, 64, 100, 1000]
+SNIPPETS_PER_GROUP = 8
+
+
+def load_clean(ref: str | None = None) -> ModuleType:
+    """clean.py from the working tree, or as of a git revision."""
+    if ref is None:
+        path = SCRIPTS / "clean.py"
+    else:
+        source = subprocess.run(
+            ["git", "show", f"{ref}:scripts/clean.py"],
+            cwd=str(ROOT), capture_output=True, text=True, check=True,
+        ).stdout
+        path = Path(tempfile.mkdtemp(prefix="clean-bench-")) / "clean.py"
+        path.write_text(source, encoding="utf-8")
+    name = "clean" if ref is None else f"clean_{abs(hash(ref))}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Rules depend only on their own module, but keep ROOT-relative helpers pointed here
+    module.ROOT = ROOT
+    return module
+
+
+def load_corpus(extensions: set[str], skip_dirs: set[str]) -> list[tuple[Path, str]]:
+    corpus: list[tuple[Path, str]] = []
+    for path in sorted(iter_files(ROOT, skip_dirs, extensions)):
+        try:
+            corpus.append((path, path.read_text(encoding="utf-8", errors="ignore")))
+        except OSError:
+            continue
+    return corpus
+
+
+def time_per_file(
+    fn: Callable[[str, str], tuple[str, int]],
+    corpus: list[tuple[Path, str]],
+    rounds: int,
+) -> list[float]:
+    """Best-of-rounds seconds for each file."""
+    best = [float("inf")] * len(corpus)
+    for _ in range(rounds):
+        for i, (path, text) in enumerate(corpus):
+            t0 = time.perf_counter()
+            fn(text, path.suffix)
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return best
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def print_timings(label: str, times: list[float]) -> None:
+    print(
+        f"  {label:<14} total {sum(times) * 1000:>9.1f}ms   "
+        f"mean {sum(times) / len(times) * 1e6:>8.0f}µs   "
+        f"p50 {_percentile(times, 0.50) * 1e6:>7.0f}µs   "
+        f"p95 {_percentile(times, 0.95) * 1e6:>8.0f}µs   "
+        f"max {max(times) * 1000:>7.1f}ms"
+    )
+
+
+def time_command(cmd: list[str]) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(cmd, cwd=str(ROOT), capture_output=True, text=True)
+    return time.perf_counter() - t0
+
+
+def bench_tsc(clean: ModuleType, rounds: int) -> None:
+    """
+    An --apply run type-checks three times (baseline, after fixes, after the
+    @ts-expect-error / @types phases). Before build info was kept, each was cold.
+    """
+    if not (ROOT / "node_modules" / ".bin" / "tsc").exists():
+        print("tsc is not installed here (node_modules/.bin/tsc) — run npm install first.")
+        sys.exit(1)
+
+    cold: list[float] = []
+    warm: list[float] = []
+    with tempfile.TemporaryDirectory(prefix="clean-bench-tsc-") as tmp:
+        build_info = Path(tmp) / "tsc.tsbuildinfo"
+        for _ in range(rounds):
+            build_info.unlink(missing_ok=True)
+            cold.append(time_command(clean.tsc_command(build_info)))
+            warm.append(time_command(clean.tsc_command(build_info)))
+
+    c, w = min(cold), min(warm)
+    print(f"tsc --noEmit on {ROOT.name}/, best of {rounds}\n")
+    print(f"  cold (no build info)         {c:>7.2f}s")
+    print(f"  warm (build info, no edits)  {w:>7.2f}s   {c / w:.1f}x")
+    print(f"\n  3 checks per --apply run:")
+    print(f"    all cold (before)          {3 * c:>7.2f}s")
+    print(f"    first run: cold + 2 warm   {c + 2 * w:>7.2f}s")
+    print(f"    later runs: 3 warm         {3 * w:>7.2f}s")
+
+
+def _cache_scenarios(clean: ModuleType) -> list[tuple[str, list[str]]]:
+    return [
+        ("full clear (before)", clean.STALE_TARGETS),
+        ("after renames / deletions", clean.RENAME_STALE_TARGETS),
+        ("after edits / no changes", []),
+    ]
+
+
+def _bench_cache_scenarios(clean: ModuleType, rounds: int, run: Callable[[], float]) -> None:
+    """Best-of-rounds `run()` after each cache clear clean.py can make."""
+    scenarios = _cache_scenarios(clean)
+    run()  # warm-up: every scenario starts from a populated cache
+
+    best: dict[str, float] = {}
+    for label, targets in scenarios:
+        times: list[float] = []
+        for _ in range(rounds):
+            for name in targets:
+                target: Path = ROOT / name
+                if target.is_dir():
+                    shutil.rmtree(target)
+                elif target.exists():
+                    target.unlink()
+            times.append(run())
+        best[label] = min(times)
+
+    cold: float = best[scenarios[0][0]]
+    for label, _ in scenarios:
+        print(f"  {label:<28} {best[label]:>7.1f}s   {cold / best[label]:.1f}x")
+
+
+def _next_bin() -> Path:
+    next_bin: Path = ROOT / "node_modules" / ".bin" / "next"
+    if not next_bin.exists():
+        print("next is not installed here (node_modules/.bin/next) — run npm install first.")
+        sys.exit(1)
+    return next_bin
+
+
+def bench_next_build(clean: ModuleType, rounds: int) -> None:
+    """
+    --apply used to delete all of .next, .swc and tsbuildinfo; now it only
+    drops what the run made stale (see clean.stale_cache_targets).
+    """
+    build: list[str] = [str(_next_bin()), "build"]
+    print(f"next build on {ROOT.name}/, best of {rounds} (warming up first)\n")
+    _bench_cache_scenarios(clean, rounds, lambda: time_command(build))
+
+
+def time_next_dev(next_bin: Path, port: int = 3999) -> float:
+    """Seconds from `next dev --turbo` start to the first response for /."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [str(next_bin), "dev", "--turbo", "-p", str(port)], cwd=str(ROOT),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=os.name != "nt",
+    )
+    try:
+        while proc.poll() is None:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=600).read()
+            except urllib.error.HTTPError:
+                pass  # compiled, even if the page itself errors
+            except OSError:
+                time.sleep(0.2)  # not listening yet
+                continue
+            return time.perf_counter() - t0
+        print(f"next dev exited with status {proc.returncode}")
+        sys.exit(1)
+    finally:
+        # next dev forks its compiler workers: stop the whole group
+        if os.name == "nt":
+            proc.terminate()
+        elif proc.poll() is None:
+            os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait()
+
+
+def bench_next_dev(clean: ModuleType, rounds: int) -> None:
+    """
+    `npm run dev` runs Turbopack, whose persistent cache clean.py drops after
+    renames (RENAME_STALE_TARGETS) unless the dev server is running.
+    """
+    if clean.dev_server_running():
+        print("npm run dev is running — stop it first, the bench needs .next to itself.")
+        sys.exit(1)
+    next_bin: Path = _next_bin()
+    print(f"next dev --turbo on {ROOT.name}/, first response for /, best of {rounds} (warming up first)\n")
+    _bench_cache_scenarios(clean, rounds, lambda: time_next_dev(next_bin))
+
+
+def run_pipeline(clean: ModuleType, text: str, ext: str) -> tuple[str, int, int]:
+    """What clean.py applies to a file: the Tailwind passes, then the lint fixes."""
+    fixed, tw_count = clean.apply_tailwind_fixes(text, ext)
+    fixed, lint_count = clean.apply_lint_fixes(fixed, ext)
+    return fixed, tw_count, lint_count
+
+
+def bench_groups(clean: ModuleType, corpus: list[tuple[Path, str]], rounds: int) -> None:
+    """
+    Each pass is timed where it runs in apply_tailwind_fixes (on the text the
+    passes before it produced, skipped by the same gates), lint on the result.
+    """
+    names: list[str] = [name for name, *_ in clean.TAILWIND_PASSES] + ["lint"]
+    per_round: dict[str, list[float]] = {name: [] for name in names}
+    ran: dict[str, int] = dict.fromkeys(names, 0)
+    perf = time.perf_counter
+    for r in range(rounds):
+        totals: dict[str, float] = dict.fromkeys(names, 0.0)
+        for path, text in corpus:
+            ext: str = path.suffix
+            for name, apply_pass, skip_exts, required in clean.TAILWIND_PASSES:
+                if ext in skip_exts or not any(needle in text for needle in required):
+                    continue
+                t0 = perf()
+                text, _ = apply_pass(text)
+                totals[name] += perf() - t0
+                ran[name] += r == 0
+            t0 = perf()
+            clean.apply_lint_fixes(text, ext)
+            totals["lint"] += perf() - t0
+            ran["lint"] += r == 0
+        for name in names:
+            per_round[name].append(totals[name])
+
+    print(f"  {'group':<16} {'files':>6} {'min':>9} {'max':>9} {'mean':>9} {'stddev':>9} {'median':>9}  (ms per round, {rounds} rounds)")
+    for name in sorted(names, key=lambda n: -min(per_round[n])):
+        times: list[float] = [t * 1000 for t in per_round[name]]
+        spread: float = statistics.stdev(times) if len(times) > 1 else 0.0
+        print(f"  {name:<16} {ran[name]:>6} {min(times):>9.2f} {max(times):>9.2f} "
+              f"{statistics.mean(times):>9.2f} {spread:>9.2f} {statistics.median(times):>9.2f}")
+    total: list[float] = [sum(per_round[n][i] for n in names) * 1000 for i in range(rounds)]
+    print(f"  {'all':<16} {len(corpus):>6} {min(total):>9.2f} {max(total):>9.2f} {statistics.mean(total):>9.2f}")
+
+
+def harvest_snippets(clean: ModuleType, corpus: list[tuple[Path, str]]) -> list[dict[str, str]]:
+    """
+    For every rule group, the first SNIPPETS_PER_GROUP distinct lines of the
+    repo it rewrites, each with a line of context either side; plus lines the
+    lint fixes touch. Taken in path order, so re-harvesting is stable.
+    """
+    cases: list[dict[str, str]] = []
+    seen: set[str] = set()
+
+    def take(group: str, path: Path, lines: list[str], i: int) -> None:
+        key: str = lines[i].strip()
+        if key in seen:
+            return
+        seen.add(key)
+        cases.append({
+            "name": f"{group}-{sum(c['name'].startswith(group + '-') for c in cases) + 1:02d}",
+            "source": f"{path.relative_to(ROOT).as_posix()}:{i + 1}",
+            "ext": path.suffix,
+            "input": "\n".join(lines[max(0, i - 1):i + 2]),
+        })
+
+    lint_checks: list[tuple[str, Callable[[str], bool]]] = [
+        ("lint-trailing-space", lambda line: line.strip() != "" and line != line.rstrip()),
+        ("lint-ts-ignore", lambda line: "@ts-ignore" in line),
+        ("lint-null-compare", lambda line: "== null" in line or "!= null" in line),
+    ]
+    for path, text in corpus:
+        lines: list[str] = text.split("\n")
+        for group, apply_pass, skip_exts, required in clean.TAILWIND_PASSES:
+            if path.suffix in skip_exts or sum(c["name"].startswith(group + "-") for c in cases) >= SNIPPETS_PER_GROUP:
+                continue
+            for i, line in enumerate(lines):
+                if any(needle in line for needle in required) and apply_pass(line)[1]:
+                    take(group, path, lines, i)
+                    break
+        if path.suffix in {".ts", ".tsx", ".js", ".jsx"}:
+            for group, check in lint_checks:
+                if sum(c["name"].startswith(group + "-") for c in cases) >= SNIPPETS_PER_GROUP:
+                    continue
+                for i, line in enumerate(lines):
+                    if check(line):
+                        take(group, path, lines, i)
+                        break
+
+    # Whole-file rules no line in this repo exercises
+    for name, ext, text in [
+        ("lint-file-bom", ".tsx", "\ufeffexport const a = 1\n"),
+        ("lint-file-no-final-newline", ".css", ".a { color: red; }"),
+        ("lint-file-blank-tail", ".ts", "export {}\n\n\n"),
+    ]:
+        cases.append({"name": name, "source": "synthetic", "ext": ext, "input": text})
+    return cases
+
+
+def record_golden(clean: ModuleType, cases: list[dict[str, Any]]) -> dict[str, Any]:
+    for case in cases:
+        case["output"], case["tailwind"], case["lint"] = run_pipeline(clean, case["input"], case["ext"])
+    return {
+        "cases": cases,
+        "px_to_tw": {repr(px): clean.px_to_tw(px) for px in PX_SAMPLES},
+    }
+
+
+def check_golden(clean: ModuleType, label: str = "working tree") -> None:
+    try:
+        golden: dict[str, Any] = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"Cannot read {GOLDEN.relative_to(ROOT)}: {e} — run --update-golden --harvest first.")
+        sys.exit(1)
+
+    failures: list[str] = []
+    t0 = time.perf_counter()
+    for case in golden["cases"]:
+        got: tuple[str, int, int] = run_pipeline(clean, case["input"], case["ext"])
+        expected: tuple[str, int, int] = (case["output"], case["tailwind"], case["lint"])
+        if got != expected:
+            detail = f"fixes {expected[1]}+{expected[2]} → {got[1]}+{got[2]}"
+            if got[0] != expected[0]:
+                want, have = expected[0].split("\n"), got[0].split("\n")
+                line: int = next((i for i, (a, b) in enumerate(zip(want, have)) if a != b), min(len(want), len(have)))
+                detail = (f"line {line + 1}:\n        expected {want[line] if line < len(want) else '<end>'!r}"
+                          f"\n        got      {have[line] if line < len(have) else '<end>'!r}")
+            failures.append(f"{case['name']} ({case['source']}): {detail}")
+    for px, expected_tw in golden["px_to_tw"].items():
+        got_tw: str = clean.px_to_tw(float(px))
+        if got_tw != expected_tw:
+            failures.append(f"px_to_tw({px}): expected {expected_tw!r}, got {got_tw!r}")
+    elapsed: float = time.perf_counter() - t0
+
+    total: int = len(golden["cases"]) + len(golden["px_to_tw"])
+    if failures:
+        print(f"  ✖ {label}: {len(failures)} of {total} golden check(s) differ:")
+        for failure in failures:
+            print(f"    {failure}")
+        sys.exit(1)
+    print(f"  ✔ {label}: {len(golden['cases'])} snippets and {len(golden['px_to_tw'])} px_to_tw values "
+          f"match {GOLDEN.relative_to(ROOT)} byte for byte ({elapsed * 1000:.1f}ms)")
+
+
+def update_golden(clean: ModuleType, harvest: bool) -> None:
+    if harvest or not GOLDEN.exists():
+        corpus: list[tuple[Path, str]] = load_corpus({".tsx", ".ts", ".jsx", ".css"}, clean.SKIP_DIRS)
+        cases: list[dict[str, Any]] = harvest_snippets(clean, corpus)
+    else:
+        cases = [
+            {k: case[k] for k in ("name", "source", "ext", "input")}
+            for case in json.loads(GOLDEN.read_text(encoding="utf-8"))["cases"]
+        ]
+    golden: dict[str, Any] = record_golden(clean, cases)
+    GOLDEN.write_text(json.dumps(golden, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"Recorded {len(golden['cases'])} snippets and {len(golden['px_to_tw'])} px_to_tw values "
+          f"in {GOLDEN.relative_to(ROOT)}")
+
+
+def _undo_stress_round(clean: ModuleType, root: Path, files: int, workers: int) -> list[str]:
+    """One round of --undo-stress in an empty root; returns what went wrong."""
+    undo = clean.UndoManager(root)
+    undo.enable()
+    kept, dropped = clean.WriteBatch(), clean.WriteBatch()
+    original: dict[str, bytes] = {}
+    for i in range(files):
+        rel = f"src/d{i % 16}/file {i}.tsx"
+        # Groups of three files share content, so backups dedup onto each other's blobs
+        original[rel] = f"export const v{i // 3} = {'x' * (i // 3 % 200)!r}\n".encode()
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_bytes(original[rel])
+
+    def touch(path: Path) -> None:
+        # An in-place edit: reaches a blob that is still a hard link to the file
+        with open(path, "r+b") as f:
+            f.write(b"//")
+
+    def rewrite(i: int, rel: str) -> None:
+        path = root / rel
+        kind = i % 6
+        if kind in (0, 4):                  # rewritten and committed (4 is renamed after)
+            undo.backup(path, "modify")
+            undo.backup(path, "modify")     # a second backup keeps the first
+            kept.write(path, "// rewritten\n")
+        elif kind == 1:                     # rewrite discarded (interrupted phase)
+            undo.backup(path, "modify")
+            dropped.write(path, "// rewritten\n")
+        elif kind == 2:                     # deleted
+            undo.backup(path, "delete")
+            path.unlink()
+        elif kind == 3:                     # the unlink failed
+            undo.backup(path, "delete")
+
+    def rename(i: int, rel: str) -> None:
+        if i % 6 not in (4, 5):
+            return
+        path = root / rel
+        new_path = path.with_name(path.name.replace(" ", "_"))
+        undo.backup(path, "rename", new_path)
+        os.rename(path, new_path)
+        if i % 6 == 5:                      # renamed, then edited in place
+            touch(new_path)
+
+    t0 = time.perf_counter()
+    # In clean.py's order: rewrites and deletes, the commit, then renames
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(rewrite, i, rel) for i, rel in enumerate(original)]:
+            future.result()
+        kept.commit()
+        dropped.discard()
+        for future in [pool.submit(rename, i, rel) for i, rel in enumerate(original)]:
+            future.result()
+    undo.write_manifest()
+    elapsed = time.perf_counter() - t0
+
+    problems: list[str] = []
+    for live in root.joinpath("src").rglob("*.tsx"):
+        touch(live)
+    blobs: list[Path] = [b for shard in undo.objects_dir.iterdir() for b in shard.iterdir()]
+    problems += [f"blob {b.parent.name}{b.name} is still hard-linked" for b in blobs if b.stat().st_nlink > 1]
+    for entry in undo.entries.values():
+        blob = undo.objects_dir / entry["blob"][:2] / entry["blob"][2:] if entry.get("blob") else None
+        if blob is None or not blob.is_file():
+            problems.append(f"{entry['path']}: no blob")
+        elif blob.read_bytes() != original[entry["path"]]:
+            problems.append(f"{entry['path']}: blob {entry['blob']} no longer holds the original content")
+    if len(undo.entries) != files:
+        problems.append(f"{len(undo.entries)} manifest entries for {files} backed-up files")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        undo.apply_undo()
+    for rel, content in original.items():
+        path = root / rel
+        if not path.is_file() or path.read_bytes() != content:
+            problems.append(f"{rel}: not restored by --undo")
+    problems += [f"{p.relative_to(root)}: left behind by --undo" for p in root.joinpath("src").rglob("*_*.tsx")]
+    print(f"  {files} backups on {workers} threads + manifest: {elapsed * 1000:7.1f}ms, "
+          f"{len(blobs)} blobs — {'ok' if not problems else f'{len(problems)} problem(s)'}")
+    return problems
+
+
+def undo_stress(clean: ModuleType, rounds: int, workers: int, files: int = 600) -> None:
+    """
+    Hammer UndoManager.backup / write_manifest from many threads over a temp
+    tree: rewrites committed and discarded, deletes that happen or fail,
+    renames before and after a rewrite. Every live file is then edited in
+    place; each blob must still hold its file's original bytes, none may be
+    hard-linked, and --undo must restore the tree.
+    """
+    failures: list[str] = []
+    for _ in range(rounds):
+        with tempfile.TemporaryDirectory(prefix="clean-undo-stress-") as tmp:
+            failures += _undo_stress_round(clean, Path(tmp), files, workers)
+    if failures:
+        print(f"  ✖ {len(failures)} problem(s):")
+        for failure in failures[:20]:
+            print(f"    {failure}")
+        sys.exit(1)
+    print(f"  ✔ {rounds} round(s): every blob holds the original bytes, none linked, --undo restores the tree")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="🐂 clean.py rewrite-rule benchmark")
+    parser.add_argument("--against", metavar="REF", help="Also run clean.py from this git revision and compare")
+    parser.add_argument("--ext", nargs="+", default=[".tsx"], help="Corpus file extensions (default: .tsx)")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per file (best is kept)")
+    parser.add_argument("--top", type=int, default=5, help="Show the N slowest files")
+    parser.add_argument("--tsc", action="store_true", help="Time the tsc check cold and incremental instead")
+    parser.add_argument("--next-build", action="store_true", help="Time next build after full and targeted cache clears instead")
+    parser.add_argument("--next-dev", action="store_true", help="Time next dev --turbo's first page load after the same clears")
+    parser.add_argument("--groups", action="store_true", help="Time each rule group separately")
+    parser.add_argument("--golden", action="store_true", help="Check the rules against clean-golden.json")
+    parser.add_argument("--update-golden", action="store_true", help="Re-record clean-golden.json's expected outputs")
+    parser.add_argument("--harvest", action="store_true", help="With --update-golden: re-collect the snippets from the repo")
+    parser.add_argument("--undo-stress", action="store_true", help="Check undo backups made from many threads at once")
+    parser.add_argument("--workers", type=int, default=32, help="With --undo-stress: threads backing up at once")
+    args = parser.parse_args()
+
+    current = load_clean()
+    if args.tsc:
+        bench_tsc(current, args.rounds)
+        return
+    if args.next_build:
+        bench_next_build(current, args.rounds)
+        return
+    if args.next_dev:
+        bench_next_dev(current, args.rounds)
+        return
+    if args.undo_stress:
+        undo_stress(current, args.rounds, args.workers)
+        return
+    if args.update_golden:
+        update_golden(current, args.harvest)
+        return
+    if args.golden:
+        check_golden(current)
+        if args.against:
+            check_golden(load_clean(args.against), args.against)
+        return
+    corpus = load_corpus(set(args.ext), current.SKIP_DIRS)
+    if not corpus:
+        print("No files to benchmark.")
+        return
+    print(f"Corpus: {len(corpus)} {'/'.join(args.ext)} file(s), "
+          f"{sum(len(t) for _, t in corpus) / 1e6:.1f}M chars, best of {args.rounds}\n")
+
+    if args.groups:
+        bench_groups(current, corpus, args.rounds)
+        return
+
+    times = time_per_file(current.apply_tailwind_fixes, corpus, args.rounds)
+    print_timings("working tree", times)
+
+    if args.against:
+        other = load_clean(args.against)
+        other_times = time_per_file(other.apply_tailwind_fixes, corpus, args.rounds)
+        print_timings(args.against, other_times)
+        speedups = [o / t for o, t in zip(other_times, times) if t > 0]
+        print(f"\n  speedup: {sum(other_times) / sum(times):.1f}x overall, "
+              f"{_percentile(speedups, 0.50):.1f}x median per file")
+
+        mismatched = [
+            path for path, text in corpus
+            if current.apply_tailwind_fixes(text, path.suffix) != other.apply_tailwind_fixes(text, path.suffix)
+        ]
+        if mismatched:
+            print(f"\n  ✖ output differs from {args.against} on {len(mismatched)} file(s):")
+            for path in mismatched[:10]:
+                print(f"    {path.relative_to(ROOT)}")
+            sys.exit(1)
+        print(f"  ✔ output and fix counts identical to {args.against} on every file")
+
+    if args.top:
+        print(f"\n  Slowest {min(args.top, len(corpus))} file(s):")
+        for t, (path, text) in sorted(zip(times, corpus), key=lambda x: -x[0])[:args.top]:
+            print(f"    {t * 1000:>7.2f}ms  {len(text):>8} chars  {path.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,28 +9,50 @@
 
   ⚡  WORKSPACE CLEANER  –  Run after every build / code change.
   
-    python3 scripts/clean.py          ← preview without writing (default)
-    python3 scripts/clean.py --apply  ← apply everything
-    python3 scripts/clean.py --dry    ← preview without writing
+    python3 scripts/clean.py              ← preview without writing (default)
+    python3 scripts/clean.py --apply      ← apply everything
+    python3 scripts/clean.py --undo       ← revert the last run (again for the one before)
+    python3 scripts/clean.py --dry        ← preview without writing
+    python3 scripts/clean.py --changed    ← only files changed vs HEAD (+ untracked)
+    python3 scripts/clean.py --since main ← only files changed since a git ref
+    python3 scripts/clean.py --no-cache   ← re-check files the rewrite cache skips
+    python3 scripts/clean.py --tsc-cold   ← type-check without the saved tsbuildinfo
+    python3 scripts/clean.py --tsc-daemon ← type-check via a long-lived tsc process
+    python3 scripts/clean.py --full-clear ← wipe .next / .swc / tsbuildinfo (cold rebuild)
+    python3 scripts/clean.py --profile    ← per-phase wall / CPU / files, saved for --compare
+    python3 scripts/clean.py --compare    ← diff the two newest --profile reports
 """
 
 from __future__ import annotations
 
 from _thread import lock
 import argparse
+import hashlib
 import itertools
 import json
+import multiprocessing
 import os
 import platform
+import queue
 import re
 import shutil
+import signal
+import socket
 import subprocess
 import sys
 import threading
 import time
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Match, Pattern
+from typing import Any, Callable, Iterable, Iterator, Match, Pattern
+
+from repo_walk import prune_empty_dirs, walk
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks, backups are plain copies
+    fcntl = None
 
 # ═══════════════════════════════════════════════════════════════════════════
 # BRANDING
@@ -238,46 +260,83 @@ PHASE_MESSAGES: dict[str, list[str]] = {
 
 
 class LiveSpinner:
+    """
+    Progress line redrawn when the state changes — at most every 80ms, and
+    once a second while nothing does (so a long tsc run still shows life).
+
+    Setters only assign an attribute and set an event: no lock, so the scan
+    loop never waits on the renderer, which reads the fields as they are.
+    When stdout isn't a terminal (CI, pipes), it prints a plain line on each
+    phase change and every few seconds instead of redrawing one with escape
+    codes. Phase timings come from PROFILE, not from here.
+    """
+
+    MIN_INTERVAL = 0.08      # fastest redraw on a terminal
+    IDLE_INTERVAL = 1.0      # redraw (new spinner frame) when nothing changed
+    PLAIN_INTERVAL = 5.0     # progress line for non-terminals, unless the phase changes
+
     def __init__(self) -> None:
         self._phase = "scan"
         self._running = False
         self._thread: threading.Thread | None = None
-        self._lock: lock = threading.Lock()
+        self._changed = threading.Event()
         self._fix_count = 0
         self._file_count = 0
         self._current_file: str = ""
+        self.tty: bool = sys.stdout.isatty()
+
+    def _line(self, frame: str, msg: str, emoji: str) -> str:
+        phase, fixes, files, current = self._phase, self._fix_count, self._file_count, self._current_file
+        if not self.tty:
+            parts: list[str] = [f"[{phase}] {msg}"]
+            if fixes:
+                parts.append(f"{fixes:,} fixes")
+            if files:
+                parts.append(f"{files} files")
+            if current:
+                parts.append(current)
+            return "  " + "  |  ".join(parts)
+        parts = [f"{C.GOLD}{frame}{C.RESET}  {msg}"]
+        if fixes:
+            parts.append(f"{C.GREEN}{fixes:,} fixes{C.RESET}")
+        if files:
+            parts.append(f"{C.CYAN}{files} files{C.RESET}")
+        if current:
+            short: str = current
+            if len(short) > 38:
+                short = "…" + short[-37:]
+            parts.append(f"{C.DIM}{short}{C.RESET}")
+        if emoji:
+            parts.append(emoji)
+        return "  " + "  │  ".join(parts)
 
     def _render(self) -> None:
         spin: itertools.cycle[str] = itertools.cycle(SPINNER_FRAMES)
         bull: itertools.cycle[str] = itertools.cycle(SPINNER_BULL)
-        msg_idx = 0
+        started: float = time.monotonic()
+        shown_phase: str = ""
+        shown_at: float = 0.0
         tick = 0
         while self._running:
-            frame: str = next(spin)
-            emoji: str = next(bull) if tick % 3 == 0 else ""
-            with self._lock:
-                msgs: list[str] = PHASE_MESSAGES.get(self._phase, PHASE_MESSAGES["scan"])
-                msg: str = msgs[msg_idx % len(msgs)]
-                parts: list[str] = [f"{C.GOLD}{frame}{C.RESET}  {msg}"]
-                if self._fix_count:
-                    parts.append(f"{C.GREEN}{self._fix_count:,} fixes{C.RESET}")
-                if self._file_count:
-                    parts.append(f"{C.CYAN}{self._file_count} files{C.RESET}")
-                if self._current_file:
-                    short: str = self._current_file
-                    if len(short) > 38:
-                        short: str = "…" + short[-37:]
-                    parts.append(f"{C.DIM}{short}{C.RESET}")
-                if emoji:
-                    parts.append(emoji)
-
-            line: str = "  " + "  │  ".join(parts)
-            sys.stdout.write(f"\033[2K\r{line}")
-            sys.stdout.flush()
-            time.sleep(0.08)
+            self._changed.clear()
+            phase: str = self._phase
+            msgs: list[str] = PHASE_MESSAGES.get(phase, PHASE_MESSAGES["scan"])
+            msg: str = msgs[int((time.monotonic() - started) / 2) % len(msgs)]
+            if self.tty:
+                emoji: str = next(bull) if tick % 3 == 0 else ""
+                sys.stdout.write(f"\033[2K\r{self._line(next(spin), msg, emoji)}")
+                sys.stdout.flush()
+                self._changed.wait(self.IDLE_INTERVAL)
+                time.sleep(self.MIN_INTERVAL)
+            else:
+                now: float = time.monotonic()
+                if phase != shown_phase or now - shown_at >= self.PLAIN_INTERVAL:
+                    print(self._line("", msg, ""), flush=True)
+                    shown_phase, shown_at = phase, now
+                # Asleep until something changes or the next line is due
+                self._changed.wait(max(0.0, shown_at + self.PLAIN_INTERVAL - time.monotonic()))
+                time.sleep(self.MIN_INTERVAL)
             tick += 1
-            if tick % 25 == 0:
-                msg_idx += 1
 
     def start(self) -> None:
         self._running = True
@@ -286,23 +345,27 @@ class LiveSpinner:
 
     def stop(self) -> None:
         self._running = False
+        self._changed.set()
         if self._thread:
             self._thread.join(timeout=1)
-        sys.stdout.write("\033[2K\r")
-        sys.stdout.flush()
+        self.set_phase("done")
+        if self.tty:
+            sys.stdout.write("\033[2K\r")
+            sys.stdout.flush()
 
     def set_phase(self, phase: str) -> None:
-        with self._lock:
-            self._phase: str = phase
+        if phase != self._phase:
+            self._phase = phase
+            self._changed.set()
 
     def set_file(self, name: str) -> None:
-        with self._lock:
-            self._current_file: str = name
+        self._current_file = name
+        self._changed.set()
 
     def set_counts(self, fixes: int = 0, files: int = 0) -> None:
-        with self._lock:
-            self._fix_count: int = fixes
-            self._file_count: int = files
+        self._fix_count = fixes
+        self._file_count = files
+        self._changed.set()
 
 
 spinner = LiveSpinner()
@@ -330,6 +393,34 @@ ROOT_JUNK_PATTERNS: set[str] = {
     "COMPLETE_SECTION_EXAMPLE.tsx", "ENHANCED_SETTINGS_MODAL.tsx",
 }
 
+BOOSTRC: Path = ROOT / ".boostrc.json"
+
+# A worker process spends ~150ms importing clean.py before its first file;
+# below ~400 files each (≈0.35ms apiece), the extra process costs more than it saves.
+MIN_FILES_PER_WORKER = 400
+
+
+def parallel_workers() -> int:
+    """`parallel_workers` from .boostrc.json — a positive int, or "auto" for one per CPU."""
+    try:
+        setting: Any = json.loads(BOOSTRC.read_text(encoding="utf-8")).get("parallel_workers", "auto")
+    except (OSError, ValueError, AttributeError):
+        setting = "auto"
+    if isinstance(setting, int) and not isinstance(setting, bool) and setting > 0:
+        return setting
+    return os.process_cpu_count() or 1
+
+
+def undo_generations() -> int:
+    """`undo_generations` from .boostrc.json — how many runs --undo can step back through."""
+    try:
+        setting: Any = json.loads(BOOSTRC.read_text(encoding="utf-8")).get("undo_generations", 5)
+    except (OSError, ValueError, AttributeError):
+        setting = 5
+    if isinstance(setting, int) and not isinstance(setting, bool) and setting > 0:
+        return setting
+    return 5
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # STATS
@@ -340,11 +431,15 @@ class Stats:
         self.tailwind_fixes = 0
         self.lint_fixes = 0
         self.files_modified = 0
+        self.files_cached = 0
         self.files_deleted: list[str] = []
         self.files_renamed: list[tuple[str, str]] = []
         self.changed_files: dict[str, int] = {}
         self.cache_cleared: list[str] = []
+        self.cache_kept: str = ""
         self.ts_errors: int | None = None
+        self.tsc_parsed: list[tuple[int, float, int]] = []  # per tsc run: bytes streamed, parse seconds, peak bytes held
+        self.phase_times: dict[str, float] = {}
         self.hot_reloaded = False
         self.deploy_ok: bool | None = None
         self.deploy_output: str = ""
@@ -377,9 +472,14 @@ class Stats:
             print(f"  {C.GREEN}{'━' * 50}{C.RESET}")
             print()
 
+        if self.files_cached:
+            print(f"  {C.GREEN}⚡{C.RESET}  {C.DIM}{self.files_cached} unchanged file(s) skipped via .bullclean/rewrite-cache.json{C.RESET}")
+
         # Always show cache / health / HMR status
         if self.cache_cleared:
             print(f"  {C.YELLOW}🗑{C.RESET}  Cleared stale caches: {C.CYAN}{', '.join(self.cache_cleared)}{C.RESET}")
+        if self.cache_kept:
+            print(f"  {C.GREEN}⚡{C.RESET}  {C.DIM}Build caches kept — {self.cache_kept}{C.RESET}")
 
         if self.ts_errors is None:
             print(f"  {C.YELLOW}⚠{C.RESET}  TypeScript: {C.YELLOW}skipped{C.RESET}")
@@ -387,6 +487,12 @@ class Stats:
             print(f"  {C.GREEN}✔{C.RESET}  TypeScript: {C.GREEN}0 errors{C.RESET}")
         else:
             print(f"  {C.RED}✖{C.RESET}  TypeScript: {C.RED}{self.ts_errors} error(s) remaining{C.RESET}")
+        if self.tsc_parsed:
+            streamed: int = sum(b for b, _, _ in self.tsc_parsed)
+            parse_ms: float = sum(t for _, t, _ in self.tsc_parsed) * 1000
+            peak: int = max(p for _, _, p in self.tsc_parsed)
+            print(f"  {C.GREEN}⚡{C.RESET}  {C.DIM}tsc output: {len(self.tsc_parsed)} run(s), {streamed / 1024:.0f} KB streamed, "
+                  f"parsed in {parse_ms:.0f}ms, peak {peak / 1024:.0f} KB held{C.RESET}")
 
         if self.hot_reloaded:
             print(f"  {C.GREEN}✔{C.RESET}  Browser hot-reload triggered  {C.DIM}(touched next.config.mjs){C.RESET}")
@@ -398,6 +504,10 @@ class Stats:
             if self.deploy_output:
                 for line in self.deploy_output.strip().split('\n')[-5:]:
                     print(f"    {C.DIM}{line}{C.RESET}")
+        if self.phase_times:
+            timings: str = "  ·  ".join(f"{phase} {secs:.1f}s" for phase, secs in self.phase_times.items() if secs >= 0.05)
+            if timings:
+                print(f"  {C.AMBER}⏱{C.RESET}  {C.DIM}{timings}{C.RESET}")
         print()
 
         if self.changed_files:
@@ -431,23 +541,143 @@ stats = Stats()
 # UNDO SUPPORT
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Linux FICLONE ioctl: a copy-on-write clone on btrfs / XFS (reflink=1) / bcachefs
+_FICLONE = 0x40049409
+
+
+def _clone_file(src: Path, dst: Path) -> bool:
+    """Reflink src to dst where the filesystem supports it; False means copy instead."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            fcntl.ioctl(fout.fileno(), _FICLONE, fin.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
 class UndoManager:
+    """
+    Content-addressed undo history under .bullclean/undo.
+
+    Each backed-up file is stored once as objects/<sha1> — a file identical in
+    several runs (or several files with the same content) shares one blob —
+    and each --apply run with backups enabled writes one generation manifest
+    under generations/. Blobs of deleted or replaced files are hard links to
+    the original: unlink() and WriteBatch's os.replace() drop its name but
+    never write through it, so the old inode is left untouched. A renamed
+    file keeps its inode (and gets edited under its new name), so its blob
+    is a reflink or a copy — as it is wherever linking fails. If the delete
+    or replace never happens (an interrupted phase, a failed commit or
+    unlink), the blob is still the live file's inode: write_manifest() and a
+    backup that dedups onto it copy such a blob first, so no in-place edit
+    can reach stored content. The newest `undo_generations` (.boostrc.json) manifests
+    are kept; blobs no manifest references are removed.
+
+    backup() is safe to call from any thread and only captures the file —
+    a hard link or reflink into staging/, or its bytes in memory — before
+    the caller goes on to overwrite or delete it. Hashing and storing the
+    blob happen on one writer thread fed by a bounded queue; flush() waits
+    for it, and write_manifest() flushes first, so the manifest only ever
+    lists stored blobs.
+    """
+
     def __init__(self, root: Path) -> None:
         self.root: Path = root
         self.enabled = False
-        self.entries: dict[str, dict[str, str | None]] = {}
-        self.undo_root: Path = root / ".bullclean"
-        self.files_dir: Path = self.undo_root / "undo-files"
-        self.manifest_path: Path = self.undo_root / "undo-manifest.json"
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.undo_root: Path = root / ".bullclean" / "undo"
+        self.objects_dir: Path = self.undo_root / "objects"
+        self.generations_dir: Path = self.undo_root / "generations"
+        self.staging_dir: Path = self.undo_root / "staging"
+        # Single-generation store used before the content-addressed one
+        self.legacy_files_dir: Path = root / ".bullclean" / "undo-files"
+        self.legacy_manifest: Path = root / ".bullclean" / "undo-manifest.json"
+        self.stored = 0       # new blobs written this run
+        self.deduped = 0      # backups that found their blob already stored
+        self._lock: lock = threading.Lock()
+        # At most 64 captures in flight: bounds the bytes held for copy-only filesystems
+        self._queue: queue.Queue[tuple[dict[str, Any], Path | bytes] | None] = queue.Queue(maxsize=64)
+        self._writer: threading.Thread | None = None
+        self._staged = itertools.count()
 
     def enable(self) -> None:
         self.enabled = True
-        if self.undo_root.exists():
+        self.entries = {}
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.generations_dir.mkdir(parents=True, exist_ok=True)
+        # Left behind only by a run that was killed mid-backup
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_blobs, name="undo-writer", daemon=True)
+            self._writer.start()
+
+    def _capture(self, path: Path, action: str) -> Path | bytes:
+        """A copy of path that survives it being rewritten or deleted right after."""
+        staged: Path = self.staging_dir / f"{next(self._staged)}"
+        # Only where path's name is deleted or replaced, never written through:
+        # a renamed file is the same inode, and later edits would reach the blob
+        if action in ("delete", "modify"):
             try:
-                shutil.rmtree(self.undo_root)
-            except Exception:
+                os.link(path, staged)
+                return staged
+            except OSError:
                 pass
-        self.files_dir.mkdir(parents=True, exist_ok=True)
+        if _clone_file(path, staged):
+            return staged
+        return path.read_bytes()
+
+    def _store(self, source: Path | bytes) -> str:
+        """sha1 of the captured content, after making sure objects/ holds it."""
+        data: bytes = source.read_bytes() if isinstance(source, Path) else source
+        digest: str = hashlib.sha1(data).hexdigest()
+        blob: Path = self.objects_dir / digest[:2] / digest[2:]
+        if blob.exists():
+            self._unshare(blob)
+            self.deduped += 1
+            if isinstance(source, Path):
+                source.unlink(missing_ok=True)
+            return digest
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(source, Path):
+            os.replace(source, blob)
+        else:
+            tmp: Path = blob.with_name(f"{blob.name}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, blob)
+        self.stored += 1
+        return digest
+
+    @staticmethod
+    def _unshare(blob: Path) -> None:
+        """Give a blob its own inode if a live file still links to it."""
+        try:
+            if blob.stat().st_nlink <= 1:
+                return
+            tmp: Path = blob.with_name(f"{blob.name}.tmp")
+            if not _clone_file(blob, tmp):
+                shutil.copyfile(blob, tmp)
+            os.replace(tmp, blob)
+        except OSError:
+            pass
+
+    def _write_blobs(self) -> None:
+        while True:
+            item: tuple[dict[str, Any], Path | bytes] | None = self._queue.get()
+            try:
+                if item is None:
+                    return
+                entry, source = item
+                try:
+                    entry["blob"] = self._store(source)
+                except OSError:
+                    with self._lock:
+                        self.entries.pop(entry["path"], None)
+            finally:
+                self._queue.task_done()
 
     def backup(self, path: Path, action: str, new_path: Path | None = None) -> None:
         if not self.enabled:
@@ -456,58 +686,123 @@ class UndoManager:
             rel = str(path.relative_to(self.root))
         except ValueError:
             return
-        if rel in self.entries:
-            return
 
-        backup_path: Path = self.files_dir / rel
-        backup_path.parent.mkdir(parents=True, exist_ok=True)
-        if path.exists() and path.is_file():
-            try:
-                shutil.copy2(path, backup_path)
-            except Exception:
-                return
-
-        entry: dict[str, str | None] = {
-            "path": rel,
-            "backup": str(backup_path.relative_to(self.root)),
-            "action": action,
-            "new_path": None,
-        }
+        entry: dict[str, Any] = {"path": rel, "blob": None, "action": action, "new_path": None}
         if new_path is not None:
             try:
                 entry["new_path"] = str(new_path.relative_to(self.root))
             except ValueError:
                 entry["new_path"] = None
-        self.entries[rel] = entry
+        with self._lock:
+            # The first backup of a path is the one that holds its original content;
+            # a rename after a rewrite still has to record where the file went
+            if rel in self.entries:
+                if entry["new_path"] is not None:
+                    self.entries[rel].update(action=action, new_path=entry["new_path"])
+                return
+            self.entries[rel] = entry
+
+        if path.is_file():
+            try:
+                st: os.stat_result = path.stat()
+                source: Path | bytes = self._capture(path, action)
+            except OSError:
+                with self._lock:
+                    del self.entries[rel]
+                return
+            entry.update(mode=st.st_mode & 0o7777, mtime=st.st_mtime)
+            self._queue.put((entry, source))
+
+    def flush(self) -> None:
+        """Wait until every captured backup is stored."""
+        if self._writer is not None:
+            self._queue.join()
+
+    def generations(self) -> list[Path]:
+        """Generation manifests, oldest first."""
+        try:
+            return sorted(self.generations_dir.glob("*.json"))
+        except OSError:
+            return []
 
     def write_manifest(self) -> None:
         if not self.enabled:
             return
+        self.flush()
+        with self._lock:
+            entries: list[dict[str, Any]] = list(self.entries.values())
+        if not entries:
+            return
+        # Writes discarded or unlinks that failed leave blobs linked to live files
+        for entry in entries:
+            if entry.get("blob"):
+                self._unshare(self.objects_dir / entry["blob"][:2] / entry["blob"][2:])
         payload: dict[str, Any] = {
             "root": str(self.root),
             "created": time.time(),
-            "entries": list(self.entries.values()),
+            "entries": entries,
         }
+        name: str = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+        path: Path = self.generations_dir / name
+        tmp: Path = path.with_suffix(".tmp")
         try:
-            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
-            self.manifest_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            self.generations_dir.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
         except Exception:
-            pass
+            return
+        self.prune(undo_generations())
+
+    def prune(self, keep: int) -> None:
+        """Drop all but the newest `keep` generations, then every blob none of them uses."""
+        manifests: list[Path] = self.generations()
+        for old in manifests[:-keep]:
+            old.unlink(missing_ok=True)
+        live: set[str] = set()
+        for manifest in manifests[-keep:]:
+            try:
+                entries = json.loads(manifest.read_text(encoding="utf-8")).get("entries", [])
+            except (OSError, ValueError):
+                continue
+            live.update(e["blob"] for e in entries if e.get("blob"))
+        try:
+            shards: list[Path] = list(self.objects_dir.iterdir())
+        except OSError:
+            shards = []
+        for shard in shards:
+            try:
+                for blob in shard.iterdir():
+                    if shard.name + blob.name not in live:
+                        blob.unlink()
+                shard.rmdir()  # fails (and stays) while it holds a live blob
+            except OSError:
+                pass
+        # The single-generation store is superseded once a generation exists
+        if self.legacy_files_dir.exists():
+            shutil.rmtree(self.legacy_files_dir, ignore_errors=True)
+        self.legacy_manifest.unlink(missing_ok=True)
 
     def apply_undo(self) -> None:
-        if not self.manifest_path.exists():
+        """Restore the newest generation and drop it: the next --undo steps back one more run."""
+        manifests: list[Path] = self.generations()
+        manifest: Path = manifests[-1] if manifests else self.legacy_manifest
+        if not manifest.exists():
             warn("No undo manifest found.")
             return
 
         try:
-            payload = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            payload = json.loads(manifest.read_text(encoding="utf-8"))
         except Exception:
             warn("Undo manifest is unreadable.")
             return
 
         entries = payload.get("entries", [])
-        # Remove renamed targets first to avoid conflicts
-        for entry in entries:
+        # Undo renames first to avoid conflicts: renamed files are restored
+        # from their blobs below, renamed directories (no blob) move back whole.
+        # Newest first: a file renamed inside a directory that was renamed
+        # after it only reaches its new_path once the directory is back.
+        restored = 0
+        for entry in reversed(entries):
             new_rel = entry.get("new_path")
             if not new_rel:
                 continue
@@ -515,7 +810,8 @@ class UndoManager:
             if new_abs.exists():
                 try:
                     if new_abs.is_dir():
-                        shutil.rmtree(new_abs)
+                        os.rename(new_abs, self.root / entry["path"])
+                        restored += 1
                     else:
                         new_abs.unlink()
                 except Exception:
@@ -523,22 +819,119 @@ class UndoManager:
 
         for entry in entries:
             rel = entry.get("path")
-            backup_rel = entry.get("backup")
-            if not rel or not backup_rel:
+            if not rel:
+                continue
+            if entry.get("blob"):
+                backup = self.objects_dir / entry["blob"][:2] / entry["blob"][2:]
+            elif entry.get("backup"):
+                backup = self.root / entry["backup"]
+            else:
                 continue
-            backup = self.root / backup_rel
             target = self.root / rel
             if backup.exists() and backup.is_file():
                 try:
                     target.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(backup, target)
+                    # Never link back: the blob may be shared with other generations
+                    target.unlink(missing_ok=True)
+                    if not _clone_file(backup, target):
+                        shutil.copyfile(backup, target)
+                    if "mode" in entry:
+                        os.chmod(target, entry["mode"])
+                        os.utime(target, (entry["mtime"], entry["mtime"]))
+                    else:
+                        shutil.copystat(backup, target)
+                    restored += 1
                 except Exception:
                     pass
 
+        if manifest != self.legacy_manifest:
+            manifest.unlink(missing_ok=True)
+            self.prune(undo_generations())
+        left: int = len(self.generations())
+        success(f"Restored {restored} file(s) from {manifest.stem}" + (f" — {left} older run(s) can still be undone" if left else ""))
+
 
 UNDO = UndoManager(ROOT)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# ATOMIC WRITES
+# ═══════════════════════════════════════════════════════════════════════════
+
+class WriteBatch:
+    """
+    Rewrites staged as temp files beside their targets and renamed into place
+    together by commit() at the end of each phase.
+
+    An interrupted run leaves every source file either untouched or fully
+    rewritten — never truncated — and the dev server's watcher sees one burst
+    of renames instead of a recompile per write. Temp files are fsynced
+    before any rename (so a crash can't expose an empty file under the real
+    name) and each directory once after, instead of the per-write flushes
+    in-place writes would need for the same guarantee.
+    """
+
+    def __init__(self) -> None:
+        self.staged: dict[Path, Path] = {}   # target → temp file beside it
+        self.committed = 0
+
+    def write(self, path: Path, text: str) -> None:
+        # Write through symlinks, as write_text did, rather than replacing the link
+        target = Path(os.path.realpath(path))
+        tmp: Path = target.with_name(f".{target.name}.bullclean-{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        try:
+            os.chmod(tmp, target.stat().st_mode & 0o7777)
+        except OSError:
+            pass
+        self.staged[target] = tmp
+
+    def commit(self) -> int:
+        """Rename every staged file into place; returns how many were."""
+        staged, self.staged = self.staged, {}
+        for tmp in staged.values():
+            try:
+                fd: int = os.open(tmp, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError:
+                pass
+        done = 0
+        dirs: set[Path] = set()
+        for target, tmp in staged.items():
+            try:
+                os.replace(tmp, target)
+                done += 1
+                dirs.add(target.parent)
+            except OSError as e:
+                tmp.unlink(missing_ok=True)
+                warn(f"Could not write {target}: {e}")
+        if hasattr(os, "O_DIRECTORY"):
+            for d in dirs:
+                try:
+                    fd = os.open(d, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+        self.committed += done
+        return done
+
+    def discard(self) -> None:
+        """Drop staged writes (interrupted phase): their targets keep the old content."""
+        for tmp in self.staged.values():
+            tmp.unlink(missing_ok=True)
+        self.staged = {}
+
+
+WRITES = WriteBatch()
+
+
 def prompt_yes_no(message: str, default: bool = False) -> bool:
     if not sys.stdin.isatty():
         return default
@@ -584,170 +977,251 @@ _VIEWPORT_MAP: dict[str, str] = {
     "min-h-[100svh]": "min-h-svh", "max-h-[100dvh]": "max-h-dvh",
 }
 
+# ── Literal renames (one alternation per group, replacement looked up by match) ──
+_V4_RENAMES: dict[str, str] = {
+    "bg-gradient-to-": "bg-linear-to-",
+    "decoration-clone": "box-decoration-clone",
+    "decoration-slice": "box-decoration-slice",
+}
+_UTILITY_RENAMES: dict[str, str] = {
+    "flex-grow-0": "grow-0", "flex-grow": "grow",
+    "flex-shrink-0": "shrink-0", "flex-shrink": "shrink",
+    "overflow-ellipsis": "text-ellipsis", "break-words": "wrap-break-word",
+    "break-all": "wrap-break-all", "break-normal": "wrap-normal",
+}
+_DESCENDANT_VARIANTS: dict[str, str] = {
+    "[&_*]:": "**:", "[&>*]:": ">*:", "[&_p]:": "**:p-",
+}
+_ARBITRARY_TO_NATIVE: dict[str, str] = {
+    "[transform-style:preserve-3d]": "transform-3d", "[transform-style:flat]": "transform-flat",
+    "[backface-visibility:hidden]": "backface-hidden", "[backface-visibility:visible]": "backface-visible",
+}
 
-def apply_tailwind_fixes(text: str, ext: str = "") -> tuple[str, int]:
-    count = 0
+# ── Compiled rule passes ─────────────────────────────────────────────────
+# The variant prefix (md:, hover:, dark:md:, …) is not part of any pattern.
+# It used to be matched with ((?:[\w]+:)*) and copied back unchanged; since
+# an empty prefix always matches, leaving it out rewrites exactly the same
+# utilities, and re no longer tries that loop at every character of the file.
+# Likewise `\b` ahead of a literal is checked with a lookbehind after it, so
+# patterns start with a literal and re can jump straight to candidates.
+
+def _word(literal: str, tail: str = "") -> str:
+    """`\\b<literal><tail>`, with the boundary tested after the literal."""
+    escaped = re.escape(literal)
+    return rf"{escaped}(?<!\w{escaped}){tail}"
+
+
+_CONNECTS = re.compile(r'[\w-]*')
+
+
+class RuleGroup:
+    """
+    Consecutive rules merged into one alternation, dispatched on the named
+    group of the alternative that matched.
+
+    Every match contains `anchor` at most `window` characters after its start,
+    so subn() finds the anchors with one fast scan and only tries the merged
+    pattern in the window before each — rules that must start with an
+    alternation (w|h|top|…) otherwise cost a match attempt per character.
+
+    Merging is only equivalent to running the rules one after another while
+    no replacement runs straight (via word characters and hyphens) into the
+    next anchor: p-[1px]-[3px] → p-px-[3px] lets the px rule see a new
+    `px-[3px]`. Text like that is handed to the rules one at a time instead.
+    """
+
+    def __init__(
+        self,
+        rules: list[tuple[str, str, Callable[[Match[str]], str]]],
+        anchor: str,
+        window: int,
+    ) -> None:
+        self.regex: Pattern[str] = re.compile("|".join(f"(?P<{name}>{body})" for name, body, _ in rules))
+        self.pattern: str = self.regex.pattern
+        self.handlers: dict[str, Callable[[Match[str]], str]] = {name: fn for name, _, fn in rules}
+        self.rules: list[tuple[Pattern[str], Callable[[Match[str]], str]]] = [
+            (re.compile(f"(?P<{name}>{body})"), fn) for name, body, fn in rules
+        ]
+        self.anchor: Pattern[str] = re.compile(anchor)
+        self.window: int = window
+
+    def subn_sequential(self, text: str) -> tuple[str, int]:
+        count = 0
+        for regex, fn in self.rules:
+            text, n = regex.subn(fn, text)
+            count += n
+        return text, count
+
+    def subn(self, text: str) -> tuple[str, int]:
+        match = self.regex.match
+        parts: list[str] = []
+        count = 0
+        last = 0  # end of the text copied so far
+        pos = 0   # next position re's own scan would try
+        for hit in self.anchor.finditer(text):
+            a: int = hit.start()
+            if a < pos:
+                continue
+            if count and a - last < self.window and _CONNECTS.fullmatch(text, last, a):
+                return self.subn_sequential(text)
+            p: int = max(pos, a - self.window)
+            while p <= a:
+                m: Match[str] | None = match(text, p)
+                if m is None:
+                    p += 1
+                    continue
+                parts.append(text[last:m.start()])
+                parts.append(self.handlers[m.lastgroup](m))
+                count += 1
+                last = p = m.end()
+            pos = p
+        if not count:
+            return text, 0
+        parts.append(text[last:])
+        return "".join(parts), count
+
+
+def _subn(pattern: Pattern[str], repl: str | Callable[[Match[str]], str]) -> Callable[[str], tuple[str, int]]:
+    return lambda text: pattern.subn(repl, text)
+
+
+def _from_table(table: dict[str, str]) -> Callable[[Match[str]], str]:
+    return lambda m: table[m.group(0)]
+
+
+def _fix_border_px(m: Match[str]) -> str:
+    px_val = float(m["border_px_value"])
+    if px_val == 1:
+        return "border"
+    return f"border-{px_to_tw(px_val)}"
+
+
+def _fix_rem_value(m: Match[str]) -> str:
+    prop = m["rem_prop"]
+    rem_key = m["rem_value"] + "rem"
+
+    # For width props, prefer named sizes (xs, sm, md, lg, etc.)
+    if prop in ("w", "max-w", "min-w"):
+        if rem_key in _REM_TO_NAMED:
+            return f"{prop}-{_REM_TO_NAMED[rem_key]}"
+    # Fall back to numeric spacing
+    if rem_key in _REM_TO_SPACING:
+        return f"{prop}-{_REM_TO_SPACING[rem_key]}"
+    return m.group(0)  # no change
+
+
+# ── Gradient / decoration (v3 → v4) ──────────────────────────────
+_RE_V4_RENAMES: Pattern[str] = re.compile(
+    _word("bg-gradient-to-")
+    + "|" + _word("decoration-clone", r"\b") + r"(?<!box-decoration-clone)"
+    + "|" + _word("decoration-slice", r"\b") + r"(?<!box-decoration-slice)"
+)
 
-    def counted_sub(
-        pattern: str | Pattern[str],
-        repl: str | Callable[[Match[str]], str],
-        s: str,
-        flags: int = 0,
-    ) -> str:
-        nonlocal count
-        new, n = re.subn(pattern, repl, s, flags=flags)
-        count += n
-        return new
-
-    # ── Gradient / decoration (v3 → v4) ──────────────────────────────
-    text = counted_sub(r'\bbg-gradient-to-', 'bg-linear-to-', text)
-    text = counted_sub(r'(?<!box-)\bdecoration-clone\b', 'box-decoration-clone', text)
-    text = counted_sub(r'(?<!box-)\bdecoration-slice\b', 'box-decoration-slice', text)
-
-    # ── Opacity shorthand: class/[0.05] → class/5 ───────────────────
-    def fix_opacity(m: Match[str]) -> str:
-        return f"{m.group(1)}/{round(float(m.group(2)) * 100)}"
-    text = counted_sub(r'([\w:.-]+)/\[(\d+\.\d+)\]', fix_opacity, text)
-
-    # ── Z-index: do NOT rewrite (allow all values) ──────────────────
-
-    # ── Pixel values to spacing tokens ───────────────────────────────
-    # Prefer `*-px` for 1px spacing utilities
-    def fix_one_px(m: Match[str]) -> str:
-        return f"{m.group(1)}px"
-    text = counted_sub(
-        r'((?:[\w]+:)*(?:max-|min-)?(?:w|h|top|bottom|left|right|inset|inset-x|inset-y|'
-        r'gap|space-x|space-y|p|px|py|pt|pb|pl|pr|m|mx|my|mt|mb|ml|mr|size|basis|indent|'
-        r'scroll-m|scroll-p|rounded|border-spacing|translate-x|translate-y)-)\[1px\]',
-        fix_one_px, text
-    )
-    def fix_px(m: Match[str]) -> str:
-        return f"{m.group(1)}{px_to_tw(float(m.group(2)))}"
-    text = counted_sub(
-        r'((?:[\w]+:)*(?:max-|min-)?(?:w|h|top|bottom|left|right|inset|gap|space-x|space-y|'
-        r'p|px|py|pt|pb|pl|pr|m|mx|my|mt|mb|ml|mr|size|basis|indent|scroll-m|scroll-p|'
-        r'rounded|border-spacing|translate-x|translate-y)-)\[(\d+(?:\.\d+)?)px\]',
-        fix_px, text
-    )
-
-    def fix_neg_px(m: Match[str]) -> str:
-        return f"{m.group(1) or ''}-{m.group(2)}-{px_to_tw(float(m.group(3)))}"
-    text = counted_sub(
-        r'((?:[\w]+:)*)(top|bottom|left|right|inset|translate-x|translate-y)-\[-(\d+(?:\.\d+)?)px\]',
-        fix_neg_px, text
-    )
-
-    def fix_border_px(m: Match[str]) -> str:
-        px_val = float(m.group(2))
-        if px_val == 1:
-            return f"{m.group(1)}border"
-        return f"{m.group(1)}border-{px_to_tw(px_val)}"
-    text = counted_sub(r'((?:[\w]+:)*)border-\[(\d+(?:\.\d+)?)px\]', fix_border_px, text)
-
-    # ── Flex utilities ───────────────────────────────────────────────
-    text = counted_sub(r'\bflex-grow-0\b', 'grow-0', text)
-    text = counted_sub(r'\bflex-grow\b(?!-)', 'grow', text)
-    text = counted_sub(r'\bflex-shrink-0\b', 'shrink-0', text)
-    text = counted_sub(r'\bflex-shrink\b(?!-)', 'shrink', text)
-
-    # ── Renamed utilities (v4) ───────────────────────────────────────
-    text = counted_sub(r'\boverflow-ellipsis\b', 'text-ellipsis', text)
-    text = counted_sub(r'\bbreak-words\b', 'wrap-break-word', text)
-    text = counted_sub(r'\bbreak-all\b', 'wrap-break-all', text)
-    text = counted_sub(r'\bbreak-normal\b', 'wrap-normal', text)
-
-    # ── Important modifier: !prefix → prefix! (v4) ──────────────────
-    # Matches things like !max-w-none, !p-0, !mt-4, etc. in className contexts
-    # SAFETY: requires a hyphen in the class name to avoid matching JS negation (!key, !password)
+# ── Opacity shorthand: class/[0.05] → class/5 ───────────────────
+_RE_OPACITY: Pattern[str] = re.compile(r'/(?<=[\w:.-]/)\[(\d+\.\d+)\]')
+
+# ── Z-index: do NOT rewrite (allow all values) ──────────────────
+
+# ── Pixel values to spacing tokens ───────────────────────────────
+# Prefer `*-px` for 1px spacing utilities; border-[1px] → border.
+# A max-/min- ahead of the prop is left in place, like the variant prefix.
+# Longest text ahead of the "-[" anchor: "border-spacing" (14).
+PIXEL_RULES = RuleGroup([
+    ("one_px",
+     r'(?P<one_px_prop>(?:w|h|top|bottom|left|right|inset|inset-x|inset-y|'
+     r'gap|space-x|space-y|p|px|py|pt|pb|pl|pr|m|mx|my|mt|mb|ml|mr|size|basis|indent|'
+     r'scroll-m|scroll-p|rounded|border-spacing|translate-x|translate-y)-)\[1px\]',
+     lambda m: f"{m['one_px_prop']}px"),
+    ("px",
+     r'(?P<px_prop>(?:w|h|top|bottom|left|right|inset|gap|space-x|space-y|'
+     r'p|px|py|pt|pb|pl|pr|m|mx|my|mt|mb|ml|mr|size|basis|indent|scroll-m|scroll-p|'
+     r'rounded|border-spacing|translate-x|translate-y)-)\[(?P<px_value>\d+(?:\.\d+)?)px\]',
+     lambda m: f"{m['px_prop']}{px_to_tw(float(m['px_value']))}"),
+    ("neg_px",
+     r'(?P<neg_px_prop>top|bottom|left|right|inset|translate-x|translate-y)-\[-(?P<neg_px_value>\d+(?:\.\d+)?)px\]',
+     lambda m: f"-{m['neg_px_prop']}-{px_to_tw(float(m['neg_px_value']))}"),
+    ("border_px", r'border-\[(?P<border_px_value>\d+(?:\.\d+)?)px\]', _fix_border_px),
+], anchor=r'-\[', window=14)
+
+# ── Flex utilities / renamed utilities (v4) ──────────────────────
+_RE_UTILITY_RENAMES: Pattern[str] = re.compile("|".join([
+    _word("flex-grow-0", r"\b"), _word("flex-grow", r"\b(?!-)"),
+    _word("flex-shrink-0", r"\b"), _word("flex-shrink", r"\b(?!-)"),
+    _word("overflow-ellipsis", r"\b"), _word("break-words", r"\b"),
+    _word("break-all", r"\b"), _word("break-normal", r"\b"),
+]))
+
+# ── Important modifier: !prefix → prefix! (v4) ──────────────────
+# Matches things like !max-w-none, !p-0, !mt-4, etc. in className contexts
+# SAFETY: requires a hyphen in the class name to avoid matching JS negation (!key, !password)
+_RE_IMPORTANT: Pattern[str] = re.compile(r'!(?<=[\s"\'`{]!)((?:[\w]+:)*)([\w]+(?:-[\w-]+)+)')
+
+# ── Descendant variant: [&_*]: → **: and [&>*]: → >*: ──────────
+_RE_DESCENDANT_VARIANTS: Pattern[str] = re.compile(r'\[&(?:_\*|>\*|_p)\]:')
+
+# ── Arbitrary properties → native utilities ──────────────────────
+# The [^\]]+ values can contain other rules' text, so these keep one pass each.
+_RE_MASK: Pattern[str] = re.compile(r'\[mask-image:([^\]]+)\]')
+_RE_PERSPECTIVE: Pattern[str] = re.compile(r'\[perspective:([^\]]+)\]')
+_RE_ARBITRARY_TO_NATIVE: Pattern[str] = re.compile(
+    r'\[transform-style:(?:preserve-3d|flat)\]|\[backface-visibility:(?:hidden|visible)\]'
+)
+_RE_BG_LENGTH: Pattern[str] = re.compile(r'bg-\[length:([^\]]+)\]')
+_RE_BG_SIZE_ARB: Pattern[str] = re.compile(r'\[background-size:([^\]]+)\]')
+
+# ── Negative zero, viewport shorthands, rem values, inset / aspect ──
+# -right-0 → right-0, h-[100dvh] → h-dvh, max-w-[20rem] → max-w-xs,
+# inset-[-100%] → -inset-full, aspect-[3/2] → aspect-3/2.
+# Longest text ahead of the "-0" / "-[" anchor: "-translate-x" (12).
+SPACING_RULES = RuleGroup([
+    ("neg_zero",
+     r'-(?P<neg_zero_util>(?:top|bottom|left|right|inset|inset-x|inset-y|'
+     r'translate-x|translate-y|mx|my|mt|mb|ml|mr|m|scroll-m|scroll-p)-0)\b',
+     lambda m: m["neg_zero_util"]),
+    *[
+        (f"viewport_{i}", re.escape(old), lambda m, new=new: new)
+        for i, (old, new) in enumerate(_VIEWPORT_MAP.items())
+    ],
+    ("rem",
+     r'(?P<rem_prop>(?:max-|min-)?(?:w|h|size|gap|p|px|py|pt|pb|pl|pr|'
+     r'm|mx|my|mt|mb|ml|mr))-\[(?P<rem_value>\d+(?:\.\d+)?)rem\]',
+     _fix_rem_value),
+    ("inset_full", r'inset-\[-100%\]', lambda m: "-inset-full"),
+    ("aspect", r'aspect-\[(?P<ratio>\d+/\d+)\]', lambda m: f"aspect-{m['ratio']}"),
+], anchor=r'-[\[0]', window=12)
+
+
+# (name, pass, extensions to skip, required substrings) — applied in this
+# order, one scan each. Every match of a pass contains one of its required
+# substrings, so a pass is skipped outright when none of them is in the text:
+# an `in` check is a single memchr-speed scan, far cheaper than the regex.
+TAILWIND_PASSES: list[tuple[str, Callable[[str], tuple[str, int]], frozenset[str], tuple[str, ...]]] = [
+    ("v4-renames", _subn(_RE_V4_RENAMES, _from_table(_V4_RENAMES)), frozenset(),
+     ("bg-gradient-to-", "decoration-")),
+    ("opacity", _subn(_RE_OPACITY, lambda m: f"/{round(float(m.group(1)) * 100)}"), frozenset(), ("/[",)),
+    ("pixels", PIXEL_RULES.subn, frozenset(), ("px]",)),
+    ("utility-renames", _subn(_RE_UTILITY_RENAMES, _from_table(_UTILITY_RENAMES)), frozenset(),
+     ("flex-", "break-", "overflow-ellipsis")),
     # SAFETY: skip .js files entirely — they never contain Tailwind class names
-    if ext not in {'.js'}:
-        def fix_important(m: Match[str]) -> str:
-            return f"{m.group(1)}{m.group(2)}!"
-        text = counted_sub(
-            r'(?<=[\s"\'`{])!((?:[\w]+:)*)([\w]+(?:-[\w-]+)+)',
-            fix_important, text
-        )
+    ("important", _subn(_RE_IMPORTANT, r'\1\2!'), frozenset({".js"}), ("!",)),
+    ("descendant", _subn(_RE_DESCENDANT_VARIANTS, _from_table(_DESCENDANT_VARIANTS)), frozenset(), ("[&",)),
+    ("mask", _subn(_RE_MASK, r'mask-[\1]'), frozenset(), ("[mask-image:",)),
+    ("perspective", _subn(_RE_PERSPECTIVE, r'perspective-[\1]'), frozenset(), ("[perspective:",)),
+    ("arbitrary", _subn(_RE_ARBITRARY_TO_NATIVE, _from_table(_ARBITRARY_TO_NATIVE)), frozenset(),
+     ("[transform-style:", "[backface-visibility:")),
+    ("bg-length", _subn(_RE_BG_LENGTH, r'bg-size-[\1]'), frozenset(), ("bg-[length:",)),
+    ("bg-size", _subn(_RE_BG_SIZE_ARB, r'bg-size-[\1]'), frozenset(), ("[background-size:",)),
+    ("spacing", SPACING_RULES.subn, frozenset(), ("-[", "-0")),
+]
 
-    # ── Descendant variant: [&_*]: → **: and [&>*]: → >*: ──────────
-    text = counted_sub(r'\[&_\*\]:', '**:', text)
-    text = counted_sub(r'\[&>\*\]:', '>*:', text)
-    text = counted_sub(r'\[&_p\]:', '**:p-', text)  # common descendant
-
-    # ── Arbitrary properties → native utilities ──────────────────────
-    # [mask-image:X] → mask-[X]
-    def fix_mask(m: Match[str]) -> str:
-        return f"{m.group(1) or ''}mask-[{m.group(2)}]"
-    text = counted_sub(r'((?:[\w]+:)*)\[mask-image:([^\]]+)\]', fix_mask, text)
-
-    # [perspective:X] → perspective-[X]
-    def fix_perspective(m: Match[str]) -> str:
-        return f"{m.group(1) or ''}perspective-[{m.group(2)}]"
-    text = counted_sub(r'((?:[\w]+:)*)\[perspective:([^\]]+)\]', fix_perspective, text)
-
-    # [transform-style:preserve-3d] → transform-3d
-    text = counted_sub(r'\[transform-style:preserve-3d\]', 'transform-3d', text)
-    text = counted_sub(r'\[transform-style:flat\]', 'transform-flat', text)
-
-    # [backface-visibility:hidden] → backface-hidden
-    text = counted_sub(r'\[backface-visibility:hidden\]', 'backface-hidden', text)
-    text = counted_sub(r'\[backface-visibility:visible\]', 'backface-visible', text)
-
-    # bg-[length:X] → bg-size-[X]
-    def fix_bg_length(m: Match[str]) -> str:
-        return f"{m.group(1) or ''}bg-size-[{m.group(2)}]"
-    text = counted_sub(r'((?:[\w]+:)*)bg-\[length:([^\]]+)\]', fix_bg_length, text)
-
-    # [background-size:X] → bg-size-[X]  (arbitrary property form)
-    def fix_bg_size_arb(m: Match[str]) -> str:
-        return f"{m.group(1) or ''}bg-size-[{m.group(2)}]"
-    text = counted_sub(r'((?:[\w]+:)*)\[background-size:([^\]]+)\]', fix_bg_size_arb, text)
-
-    # ── Negative zero → plain zero ──────────────────────────────────
-    # -right-0 → right-0,  -translate-x-0 → translate-x-0, etc.
-    def fix_neg_zero(m: Match[str]) -> str:
-        return f"{m.group(1) or ''}{m.group(2)}-0"
-    text = counted_sub(
-        r'((?:[\w]+:)*)-(top|bottom|left|right|inset|inset-x|inset-y|'
-        r'translate-x|translate-y|mx|my|mt|mb|ml|mr|m|scroll-m|scroll-p)-0\b',
-        fix_neg_zero, text
-    )
-
-    # ── Viewport shorthand: h-[100dvh] → h-dvh ─────────────────────
-    for old, new in _VIEWPORT_MAP.items():
-        # Handle with optional variant prefix
-        pattern: str = r'((?:[\w]+:)*)' + re.escape(old)
-        replacement: str = r'\1' + new
-        text = counted_sub(pattern, replacement, text)
-
-    # ── Rem values → spacing / named widths ─────────────────────────
-    def fix_rem_value(m: Match[str]) -> str:
-        prefix = m.group(1)
-        prop = m.group(2)
-        rem_str = m.group(3)
-        rem_key = rem_str + "rem"
-
-        # For width props, prefer named sizes (xs, sm, md, lg, etc.)
-        if prop in ("w", "max-w", "min-w"):
-            if rem_key in _REM_TO_NAMED:
-                return f"{prefix}{prop}-{_REM_TO_NAMED[rem_key]}"
-        # Fall back to numeric spacing
-        if rem_key in _REM_TO_SPACING:
-            return f"{prefix}{prop}-{_REM_TO_SPACING[rem_key]}"
-        return m.group(0)  # no change
-
-    text = counted_sub(
-        r'((?:[\w]+:)*)((?:max-|min-)?(?:w|h|size|gap|p|px|py|pt|pb|pl|pr|'
-        r'm|mx|my|mt|mb|ml|mr))-\[(\d+(?:\.\d+)?)rem\]',
-        fix_rem_value, text
-    )
-
-    # ── Specific common replacements ─────────────────────────────────
-    # inset-[-100%] → -inset-full  (common pattern)
-    text = counted_sub(r'((?:[\w]+:)*)inset-\[-100%\]', r'\1-inset-full', text)
-
-    # aspect-[3/2] → aspect-3/2
-    text = counted_sub(r'((?:[\w]+:)*)aspect-\[(\d+/\d+)\]', r'\1aspect-\2', text)
 
+def apply_tailwind_fixes(text: str, ext: str = "") -> tuple[str, int]:
+    count = 0
+    for _, apply_pass, skip_exts, required in TAILWIND_PASSES:
+        if ext in skip_exts or not any(needle in text for needle in required):
+            continue
+        text, n = apply_pass(text)
+        count += n
     return text, count
 
 
@@ -800,19 +1274,28 @@ def apply_lint_fixes(text: str, ext: str) -> tuple[str, int]:
     return text, count
 
 
-def contains_sql(text: str) -> bool:
-    # Heuristic to avoid mutating embedded SQL in JS/TS strings.
-    return bool(re.search(r"\b(select|insert|update|delete|from|where|join|group\s+by|order\s+by)\b", text, re.IGNORECASE))
-
-
-def contains_scroll_sensitive(text: str) -> bool:
-    # Avoid touching files with scroll/overflow rules to prevent scroll regressions.
-    return bool(re.search(r"\b(overflow-|overscroll-|scroll-|scrollbar|touch-action|scroll-snap)\b", text))
+# ── Content guards: files that must not be rewritten at all ─────
+#  • SQL keywords (any case) — avoid mutating embedded SQL in JS/TS strings
+#  • overflow / scroll rules — avoid scroll regressions
+#  • .from('…') / .select("…") — avoid mutating Supabase query chains
+# One scan that stops at the first hit. It opens with a character class so
+# re can skip straight to candidate letters (ſ / İ / ı are what (?i) folds to
+# s / i); each branch then checks the letter it consumed with a lookbehind,
+# and `(?<!\w.)` is the \b that would have preceded that letter.
+_RE_SENSITIVE_CONTENT: Pattern[str] = re.compile(
+    r"[SsſIiİıUuDdFfWwJjGgOoTt.](?:"
+    r"(?<!\w.)(?:"
+    r"(?i:(?<=s)elect|(?<=i)nsert|(?<=u)pdate|(?<=d)elete|(?<=f)rom|(?<=w)here|(?<=j)oin"
+    r"|(?<=g)roup\s+by|(?<=o)rder\s+by)"
+    r"|(?<=o)verflow-|(?<=o)verscroll-|(?<=s)croll-|(?<=s)crollbar|(?<=t)ouch-action|(?<=s)croll-snap"
+    r")\b"
+    r"|(?<=\.)(?:from|select|insert|update|delete)\(\s*['\"]"
+    r")"
+)
 
 
-def contains_supabase_query(text: str) -> bool:
-    # Heuristic to avoid mutating Supabase query chains in client/server code.
-    return bool(re.search(r"\.(from|select|insert|update|delete)\(\s*['\"]", text))
+def contains_sensitive_content(text: str) -> bool:
+    return _RE_SENSITIVE_CONTENT.search(text) is not None
 
 
 SQL_SENSITIVE_PATH_SUBSTRINGS: tuple[str, ...] = (
@@ -886,115 +1369,583 @@ def should_skip_rename(path: Path) -> bool:
 def should_skip(path: Path) -> bool:
     return any(part in SKIP_DIRS for part in path.parts)
 
+
+class FileIndex:
+    """
+    One pruned walk of ROOT (see repo_walk.py), shared by every phase.
+
+    SKIP_DIRS and .gitignore'd paths are never entered (rglob used to descend
+    into node_modules and filter afterwards). Files are bucketed by extension with their stat info;
+    directories are kept for the rename and empty-dir phases. Renames and
+    deletions made by clean.py are applied to the index so later phases don't
+    have to walk again.
+
+    `mentions` is the reverse index the rename phase needs, filled in by the
+    rewrite phase while it has each file's text anyway: which of the
+    `mention_names` (rename_candidates) each code file mentions.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root: Path = root
+        self.scanned = False
+        self.by_ext: dict[str, list[Path]] = {}
+        self.dirs: list[Path] = []
+        self.stat: dict[Path, os.stat_result] = {}
+        self.mentions: dict[Path, tuple[str, ...]] = {}
+        self.mention_names: frozenset[str] = frozenset()
+
+    def scan(self) -> FileIndex:
+        by_ext: dict[str, list[Path]] = {}
+        dirs: list[Path] = []
+        stat: dict[Path, os.stat_result] = {}
+        for entry, is_dir in walk(self.root, SKIP_DIRS):
+            try:
+                if is_dir:
+                    dirs.append(Path(entry.path))
+                elif entry.is_file():
+                    path = Path(entry.path)
+                    by_ext.setdefault(os.path.splitext(entry.name)[1], []).append(path)
+                    stat[path] = entry.stat()
+            except OSError:
+                continue
+        self.by_ext, self.dirs, self.stat = by_ext, dirs, stat
+        self.scanned = True
+        return self
+
+    def ensure(self) -> FileIndex:
+        return self if self.scanned else self.scan()
+
+    def files(self, extensions: set[str] | None = None) -> list[Path]:
+        self.ensure()
+        if extensions is None:
+            return [p for paths in self.by_ext.values() for p in paths]
+        return [p for ext in extensions for p in self.by_ext.get(ext, [])]
+
+    def code_files(self) -> list[Path]:
+        return self.files(CODE_EXTENSIONS)
+
+    def all_paths(self) -> list[Path]:
+        """Files and directories (what ROOT.rglob('*') used to yield)."""
+        return self.files() + list(self.ensure().dirs)
+
+    def discard(self, path: Path) -> None:
+        bucket: list[Path] | None = self.by_ext.get(path.suffix)
+        if bucket is not None and path in self.stat:
+            bucket.remove(path)
+        self.stat.pop(path, None)
+        self.mentions.pop(path, None)
+        if path in self.dirs:
+            self.dirs.remove(path)
+
+    def rename(self, old: Path, new: Path) -> None:
+        """Re-point the renamed path (and anything under it, for directories)."""
+        def moved(p: Path) -> Path:
+            if p == old:
+                return new
+            try:
+                return new / p.relative_to(old)
+            except ValueError:
+                return p
+
+        by_ext: dict[str, list[Path]] = {}
+        stat: dict[Path, os.stat_result] = {}
+        for path, st in self.stat.items():
+            target: Path = moved(path)
+            by_ext.setdefault(target.suffix, []).append(target)
+            stat[target] = st
+        self.by_ext, self.stat = by_ext, stat
+        self.dirs = [moved(d) for d in self.dirs]
+        self.mentions = {moved(p): names for p, names in self.mentions.items()}
+
+
+INDEX = FileIndex(ROOT)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INCREMENTAL REWRITE CACHE
+# ═══════════════════════════════════════════════════════════════════════════
+
+RULE_SECTION_MARKERS: tuple[str, str] = ("# TAILWIND v4 FIXES", "# FILE SYSTEM CLEANUP")
+
+
+def ruleset_version() -> str:
+    """
+    Hash of the rule code (tailwind + lint fixes, SQL/scroll/route/protected
+    guards). Editing any of it invalidates every cached verdict; editing the
+    spinner or the report does not.
+    """
+    try:
+        source: str = Path(__file__).read_text(encoding="utf-8")
+    except OSError:
+        return ""
+    start: int = source.find(RULE_SECTION_MARKERS[0])
+    end: int = source.find(RULE_SECTION_MARKERS[1], start)
+    if start != -1 and end != -1:
+        source = source[start:end]
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+class RewriteCache:
+    """
+    Remembers what the rewrite phase found in each file, keyed by relative
+    path → (mtime_ns, size, sha1 of content, tailwind fixes, lint fixes,
+    [key of the rename candidates, the ones the file mentions]), under the
+    ruleset version that produced the verdict. The mentions stand as long as
+    the candidate set is the same, so the rename phase need not read files
+    the cache skipped.
+
+    A matching stat means the file is not even read. A stat mismatch (touch,
+    git checkout) falls back to the content hash, so the regex rules only run
+    on files whose bytes actually changed. Clean files are skipped outright;
+    files with pending fixes only skip the rules in a dry run, where the
+    counts are all that's reported.
+
+    Whether a file's content trips the SQL / Supabase / scroll guard is kept
+    separately (relative path → sha1, sensitive?), keyed by the guard pattern
+    rather than the whole ruleset: editing a Tailwind rule re-runs the rules,
+    but the guarded files — most of the repo — are still skipped unscanned.
+    """
+
+    VERSION = 2
+
+    def __init__(self, root: Path) -> None:
+        self.path: Path = root / ".bullclean" / "rewrite-cache.json"
+        self.enabled = True
+        self.ruleset: str = ""
+        self.entries: dict[str, list[Any]] = {}
+        self.guard: str = hashlib.sha1(_RE_SENSITIVE_CONTENT.pattern.encode("utf-8")).hexdigest()[:16]
+        self.sensitive: dict[str, list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> RewriteCache:
+        self.ruleset = ruleset_version()
+        self.entries = {}
+        self.sensitive = {}
+        if not self.enabled or not self.ruleset:
+            return self
+        try:
+            payload: dict[str, Any] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return self
+        if payload.get("version") != self.VERSION:
+            return self
+        if payload.get("ruleset") == self.ruleset:
+            self.entries = payload.get("files", {})
+        if payload.get("guard") == self.guard:
+            self.sensitive = payload.get("sensitive", {})
+        return self
+
+    @staticmethod
+    def digest(content: str) -> str:
+        return hashlib.sha1(content.encode("utf-8", errors="ignore")).hexdigest()
+
+    def verdict(self, rel: str, st: os.stat_result | None) -> tuple[int, int] | None:
+        """(tailwind, lint) fix counts if the file's stat is unchanged since it was checked."""
+        if not self.enabled or st is None:
+            return None
+        entry: list[Any] | None = self.entries.get(rel)
+        if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+            return None
+        return entry[3], entry[4]
+
+    def verdict_for_content(self, rel: str, digest: str) -> tuple[int, int] | None:
+        entry: list[Any] | None = self.entries.get(rel) if self.enabled else None
+        if entry is None or entry[2] != digest:
+            return None
+        return entry[3], entry[4]
+
+    def mentions(self, rel: str, names_key: str) -> tuple[str, ...] | None:
+        """Rename candidates the file mentioned, if recorded for this candidate set."""
+        entry: list[Any] | None = self.entries.get(rel) if self.enabled else None
+        if entry is None or len(entry) < 6 or entry[5][0] != names_key:
+            return None
+        return tuple(entry[5][1])
+
+    def reusable_digest(self, rel: str, apply: bool) -> str:
+        """Content hash whose cached verdict can stand in for running the rules ("" if none)."""
+        entry: list[Any] | None = self.entries.get(rel) if self.enabled else None
+        if entry is None or (apply and (entry[3] or entry[4])):
+            return ""
+        return entry[2]
+
+    def sensitivity(self, rel: str) -> tuple[str, bool] | None:
+        """(sha1, sensitive?) from the last time the content guard scanned this file."""
+        entry: list[Any] | None = self.sensitive.get(rel) if self.enabled else None
+        return (entry[0], entry[1]) if entry is not None else None
+
+    def record_sensitivity(self, rel: str, digest: str, sensitive: bool) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self.sensitive[rel] = [digest, sensitive]
+
+    def record(
+        self, rel: str, st: os.stat_result | None, digest: str,
+        tw_count: int = 0, lint_count: int = 0, mentions: tuple[str, tuple[str, ...]] | None = None,
+    ) -> None:
+        if not self.enabled or st is None:
+            return
+        entry: list[Any] = [st.st_mtime_ns, st.st_size, digest, tw_count, lint_count]
+        if mentions is not None:
+            entry.append([mentions[0], list(mentions[1])])
+        with self._lock:
+            self.entries[rel] = entry
+
+    def forget(self, rel: str) -> None:
+        with self._lock:
+            self.entries.pop(rel, None)
+
+    def save(self, live: set[str] | None = None) -> None:
+        """Write the cache atomically; entries outside `live` (deleted files) are dropped."""
+        if not self.enabled or not self.ruleset:
+            return
+        with self._lock:
+            files: dict[str, list[Any]] = (
+                self.entries if live is None
+                else {rel: e for rel, e in self.entries.items() if rel in live}
+            )
+            sensitive: dict[str, list[Any]] = (
+                self.sensitive if live is None
+                else {rel: e for rel, e in self.sensitive.items() if rel in live}
+            )
+            payload: dict[str, Any] = {
+                "version": self.VERSION, "ruleset": self.ruleset, "files": files,
+                "guard": self.guard, "sensitive": sensitive,
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp: Path = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+CACHE = RewriteCache(ROOT)
+
+
+class ChangeScope:
+    """
+    Limits a run to what git says changed (--changed / --since REF): the
+    changed and untracked files, plus their ancestor directories so renames
+    and empty-dir cleanup can still reach the folders they live in. Deleted
+    files count too — their now-possibly-empty parents are in scope.
+    Inactive by default, in which case everything is covered.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root: Path = root
+        self.active = False
+        self.label: str = ""
+        self.files: set[Path] = set()
+        self.dirs: set[Path] = set()
+
+    def load_from_git(self, ref: str) -> bool:
+        """Scope to files differing from ref (committed or not) plus untracked files."""
+        commands: list[list[str]] = [
+            ["git", "diff", "--name-only", "-z", "--relative", ref, "--"],
+            ["git", "ls-files", "--others", "--exclude-standard", "-z"],
+        ]
+        names: set[str] = set()
+        for cmd in commands:
+            try:
+                result = subprocess.run(cmd, cwd=str(self.root), capture_output=True, text=True, timeout=30)
+            except (OSError, subprocess.TimeoutExpired) as exc:
+                warn(f"git unavailable ({exc}) — cannot scope to changed files")
+                return False
+            if result.returncode != 0:
+                warn(f"{' '.join(cmd[:2])} failed: {result.stderr.strip() or result.returncode}")
+                return False
+            names.update(n for n in result.stdout.split("\0") if n)
+
+        self.files = {self.root / n for n in names}
+        self.dirs = {parent for f in self.files for parent in f.parents if parent != self.root and self.root in parent.parents}
+        self.active = True
+        self.label = ref
+        return True
+
+    def covers(self, path: Path) -> bool:
+        return not self.active or path in self.files or path in self.dirs
+
+
+SCOPE = ChangeScope(ROOT)
+
+
 def find_backup_files() -> list[Path]:
-    results: list[Path] = []
-    for suffix in (".bak", ".old"):
-        for p in ROOT.rglob(f"*{suffix}"):
-            if not should_skip(p) and p.is_file():
-                results.append(p)
-    return list(set(results))
+    return [p for p in INDEX.files({".bak", ".old"}) if SCOPE.covers(p)]
 
 def find_root_junk() -> list[Path]:
-    return [ROOT / n for n in ROOT_JUNK_PATTERNS if (ROOT / n).exists()]
+    return [ROOT / n for n in ROOT_JUNK_PATTERNS if (ROOT / n).exists() and SCOPE.covers(ROOT / n)]
 
 def find_files_with_spaces() -> list[Path]:
     results: list[Path] = []
-    for p in ROOT.rglob("*"):
+    for p in INDEX.all_paths():
+        if " " not in p.name:
+            continue
+        if not SCOPE.covers(p):
+            continue
         if should_skip_rename(p):
             continue
-        if " " in p.name:
-            results.append(p)
+        results.append(p)
     return sorted(results, key=lambda p: len(p.parts), reverse=True)
 
 def rename_path_no_spaces(path: Path) -> Path:
     return path.parent / path.name.replace(" ", "_")
 
-def update_imports_for_rename(old_name: str, new_name: str) -> None:
-    old_base: str = Path(old_name).name
-    new_base: str = Path(new_name).name
-    if old_base == new_base:
+# Extensions a module may be imported without ("./My Widget" → My Widget.tsx)
+IMPORTABLE_SUFFIXES: set[str] = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"}
+
+# String literals and CSS url(...) with a space in them — the only specifiers
+# a space → underscore rename can break. Comments and prose are left alone.
+# The text before the first space excludes spaces, so a literal that never
+# closes fails in one scan instead of backtracking over every space in it.
+_RE_SPACED_SPECIFIER: Pattern[str] = re.compile(
+    r"""'([^' \\\n]* [^'\\\n]*)'|"([^" \\\n]* [^"\\\n]*)"|`([^` \\$]* [^`\\$]*)`|url\(([^'") \n]* [^'")\n]*)\)"""
+)
+
+# "/img/XM LOGO.png?v=2" → ("/img/XM LOGO.png", "?v=2")
+_RE_SPECIFIER_QUERY: Pattern[str] = re.compile(r"([^?#]*)(.*)", re.DOTALL)
+
+
+def rename_candidates() -> tuple[str, ...]:
+    """
+    Every name process_file_renames may rename (and, for importable files,
+    its extensionless stem), known as soon as INDEX is scanned.
+    """
+    names: set[str] = set()
+    for p in find_files_with_spaces():
+        names.add(p.name)
+        if p.suffix in IMPORTABLE_SUFFIXES:
+            names.add(p.stem)
+    return tuple(sorted(names))
+
+
+def names_key(names: tuple[str, ...]) -> str:
+    return hashlib.sha1("\0".join(names).encode("utf-8")).hexdigest()[:16]
+
+
+def update_imports_for_renames(renames: list[tuple[str, str]]) -> None:
+    """
+    Re-point specifiers at renamed files / directories. The rewrite phase
+    already noted which rename candidates each file's text contains
+    (INDEX.mentions); only files mentioning a renamed name anywhere — in a
+    specifier, or just in a comment or prose — are read again and scanned,
+    then rewritten (and backed up) once, for all renames together. Files the
+    rewrite phase did not cover (--changed) are read here to find out.
+    A renamed name must be a whole path segment of a string literal or url().
+    """
+    segments: dict[str, str] = {}   # old name → new name, any segment
+    modules: dict[str, str] = {}    # old stem → new stem, extensionless last segment
+    for old_name, new_name in renames:
+        if old_name == new_name:
+            continue
+        segments[old_name] = new_name
+        old, new = Path(old_name), Path(new_name)
+        if old.suffix in IMPORTABLE_SUFFIXES:
+            modules[old.stem] = new.stem
+    if not segments:
         return
-    for ext in CODE_EXTENSIONS:
-        for fpath in ROOT.rglob(f"*{ext}"):
-            if should_skip(fpath):
-                continue
+
+    wanted: set[str] = {*segments, *modules}
+    indexed: bool = wanted <= INDEX.mention_names
+    targets: set[Path] = set()
+    for fpath in INDEX.code_files():
+        mentions: tuple[str, ...] | None = INDEX.mentions.get(fpath) if indexed else None
+        if mentions is None:
             try:
                 content: str = fpath.read_text(encoding="utf-8", errors="ignore")
             except Exception:
                 continue
-            new_content: str = content.replace(old_base, new_base)
-            if new_content != content:
-                if UNDO.enabled:
-                    UNDO.backup(fpath, "modify")
-                fpath.write_text(new_content, encoding="utf-8")
+            mentions = tuple(name for name in wanted if name in content)
+        if wanted.intersection(mentions):
+            targets.add(fpath)
+
+    def fix(m: Match[str]) -> str:
+        group: int = m.lastindex
+        path, query = _RE_SPECIFIER_QUERY.match(m.group(group)).groups()
+        parts: list[str] = [segments.get(part, part) for part in path.split("/")]
+        if len(parts) > 1:  # "./My Widget" is an import; a bare "My Widget" is just text
+            parts[-1] = modules.get(parts[-1], parts[-1])
+        start, end = m.span(group)
+        return f"{m.string[m.start():start]}{'/'.join(parts)}{query}{m.string[end:m.end()]}"
+
+    for fpath in sorted(targets):
+        try:
+            content: str = fpath.read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            continue
+        new_content: str = _RE_SPACED_SPECIFIER.sub(fix, content)
+        if new_content != content:
+            if UNDO.enabled:
+                UNDO.backup(fpath, "modify")
+            WRITES.write(fpath, new_content)
+    WRITES.commit()
 
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PROCESSORS
 # ═══════════════════════════════════════════════════════════════════════════
 
+# (path, sha1 whose cached verdict still holds, last content-guard result as (sha1, sensitive?))
+ScanTask = tuple[Path, str, tuple[str, bool] | None]
+# (content sha1, content guard result if it was run, tailwind fixes, lint fixes, rewritten text when applying,
+#  rename candidates the text mentions — None when the cached verdict for the sha1 stands)
+FileScan = tuple[str, bool | None, int, int, str | None, tuple[str, ...] | None]
+
+
+def scan_code_file(
+    fpath: Path,
+    apply: bool,
+    known_digest: str = "",
+    known_sensitivity: tuple[str, bool] | None = None,
+    names: tuple[str, ...] = (),
+) -> FileScan | None:
+    """
+    Read one file and run the guards and rewrite rules on it — None when it
+    can't be read. Touches no shared state, so it can run in a worker process:
+    the caller records the verdict, backs up and writes. Content hashing to
+    `known_digest` is returned unchecked; its cached verdict still holds.
+    Likewise the content guard is only run when `known_sensitivity` is for
+    other bytes. Which of `names` (rename_candidates) the text mentions is
+    noted for the rename phase, guarded files included.
+    """
+    try:
+        content: str = fpath.read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return None
+    digest: str = RewriteCache.digest(content)
+    if digest == known_digest:
+        return (digest, None, 0, 0, None, None)
+    mentions: tuple[str, ...] = tuple(name for name in names if name in content)
+
+    sensitive: bool | None = None
+    if fpath.suffix in {'.ts', '.tsx', '.js', '.jsx', '.css', '.mdx', '.html', '.vue', '.svelte'}:
+        if is_route_file(fpath) or is_protected_path(fpath) or is_sql_sensitive_path(fpath):
+            return (digest, None, 0, 0, None, mentions)
+        if known_sensitivity is not None and known_sensitivity[0] == digest:
+            sensitive = known_sensitivity[1]
+        else:
+            sensitive = contains_sensitive_content(content)
+        if sensitive:
+            # Skip all edits when SQL-like strings or scroll-sensitive rules are present.
+            return (digest, sensitive, 0, 0, None, mentions)
+
+    tw_fixed, tw_count = apply_tailwind_fixes(content, fpath.suffix)
+    lint_fixed, lint_count = apply_lint_fixes(tw_fixed, fpath.suffix)
+    if apply and tw_count + lint_count:
+        # The rename phase reads what was written
+        return (digest, sensitive, tw_count, lint_count, lint_fixed, tuple(name for name in names if name in lint_fixed))
+    return (digest, sensitive, tw_count, lint_count, None, mentions)
+
+
+def scan_code_batch(batch: list[ScanTask], apply: bool, names: tuple[str, ...] = ()) -> list[FileScan | None]:
+    """scan_code_file over a batch of tasks — one round-trip per batch."""
+    return [scan_code_file(fpath, apply, known, sensitivity, names) for fpath, known, sensitivity in batch]
+
+
 def process_code_files(apply: bool, only_files: set[Path] | None = None) -> None:
     spinner.set_phase("scan")
 
-    files: list[Path] = []
-    for ext in CODE_EXTENSIONS:
-        for fpath in ROOT.rglob(f"*{ext}"):
-            if not should_skip(fpath) and fpath.is_file():
-                if only_files is None or fpath in only_files:
-                    files.append(fpath)
+    files: list[Path] = INDEX.code_files()
+    if only_files is not None:
+        files = [f for f in files if f in only_files]
+    names: tuple[str, ...] = rename_candidates()
+    key: str = names_key(names)
+    if frozenset(names) != INDEX.mention_names:
+        INDEX.mentions, INDEX.mention_names = {}, frozenset(names)
 
     spinner.set_phase("tailwind")
 
-    # ── Parallel file processing for speed ───────────────────────────
-    def process_one(fpath: Path) -> tuple[str, int, int, str] | None:
-        rel = str(fpath.relative_to(ROOT))
-        try:
-            content: str = fpath.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
+    def note_mentions(fpath: Path, rel: str, mentions: tuple[str, ...] | None) -> tuple[str, tuple[str, ...]] | None:
+        if mentions is None:
+            mentions = CACHE.mentions(rel, key)
+        if mentions is None:
+            INDEX.mentions.pop(fpath, None)  # the rename phase reads this one itself
             return None
+        INDEX.mentions[fpath] = mentions
+        return (key, mentions)
 
-        if fpath.suffix in {'.ts', '.tsx', '.js', '.jsx', '.css', '.mdx', '.html', '.vue', '.svelte'}:
-            if (
-                is_route_file(fpath)
-                or is_protected_path(fpath)
-                or is_sql_sensitive_path(fpath)
-                or contains_sql(content)
-                or contains_supabase_query(content)
-                or contains_scroll_sensitive(content)
-            ):
-                # Skip all edits when SQL-like strings or scroll-sensitive rules are present.
-                return None
-
-        tw_fixed, tw_count = apply_tailwind_fixes(content, fpath.suffix)
-        lint_fixed, lint_count = apply_lint_fixes(tw_fixed, fpath.suffix)
-
-        total: int = tw_count + lint_count
-        if total == 0:
+    def finish(fpath: Path, scan: FileScan | None, known: str) -> tuple[str, int, int, bool] | None:
+        """Record / write one scanned file: (rel, tailwind fixes, lint fixes, answered from cache) — None when clean."""
+        if scan is None:
+            return None
+        rel = str(fpath.relative_to(ROOT))
+        st: os.stat_result | None = INDEX.stat.get(fpath)
+        digest, sensitive, tw_count, lint_count, fixed, mentions = scan
+        if sensitive is not None:
+            CACHE.record_sensitivity(rel, digest, sensitive)
+        noted: tuple[str, tuple[str, ...]] | None = note_mentions(fpath, rel, mentions)
+        if digest == known:
+            cached: tuple[int, int] | None = CACHE.verdict_for_content(rel, digest)
+            CACHE.record(rel, st, digest, *cached, mentions=noted)  # touched but unchanged
+            return (rel, cached[0], cached[1], True)
+        if tw_count + lint_count == 0:
+            CACHE.record(rel, st, digest, mentions=noted)
             return None
 
         if apply:
             if UNDO.enabled:
                 UNDO.backup(fpath, "modify")
-            fpath.write_text(lint_fixed, encoding="utf-8")
+            WRITES.write(fpath, fixed)
+            CACHE.forget(rel)  # re-checked (and cached) on the next run
+        else:
+            CACHE.record(rel, st, digest, tw_count, lint_count, noted)
+        return (rel, tw_count, lint_count, False)
 
-        return (rel, tw_count, lint_count, lint_fixed)
+    def report(result: tuple[str, int, int, bool] | None) -> None:
+        if result is None:
+            return
+        rel, tw_count, lint_count, from_cache = result
+        if from_cache:
+            stats.files_cached += 1
+        if tw_count + lint_count == 0:
+            return
+        stats.tailwind_fixes += tw_count
+        stats.lint_fixes += lint_count
+        stats.files_modified += 1
+        stats.changed_files[rel] = tw_count + lint_count
+        spinner.set_file(rel)
+        spinner.set_counts(stats.total, stats.files_modified)
 
-    workers: int = min(8, max(1, len(files) // 20))
-    with ThreadPoolExecutor(max_workers=workers) as pool:
-        futures: list[Future[tuple[str, int, int, str] | None]] = [
-            pool.submit(process_one, f) for f in files
+    # Unchanged stat → the cached verdict answers without reading the file
+    pending: list[ScanTask] = []
+    for fpath in files:
+        rel = str(fpath.relative_to(ROOT))
+        cached: tuple[int, int] | None = CACHE.verdict(rel, INDEX.stat.get(fpath))
+        if cached is not None and (cached == (0, 0) or not apply):
+            note_mentions(fpath, rel, None)
+            report((rel, cached[0], cached[1], True))
+        else:
+            pending.append((fpath, CACHE.reusable_digest(rel, apply), CACHE.sensitivity(rel)))
+
+    # ── The rules are pure-Python CPU work: threads would just queue on the
+    # GIL, so big scans go to worker processes in batches. Workers read the
+    # files themselves and send back only counts (and rewritten text when
+    # applying); backups, writes and the cache stay in this process.
+    workers: int = 1 if PROFILE.profiling else min(parallel_workers(), len(pending) // MIN_FILES_PER_WORKER)
+    PROFILE.workers = max(PROFILE.workers, workers)
+    if workers > 1:
+        batch_size: int = -(-len(pending) // (workers * 4))  # ~4 batches per worker evens out stragglers
+        batches: list[list[ScanTask]] = [
+            pending[i:i + batch_size] for i in range(0, len(pending), batch_size)
         ]
-        for future in as_completed(futures):
-            result: tuple[str, int, int, str] | None = future.result()
-            if result is None:
-                continue
-            rel, tw_count, lint_count, _ = result
-            stats.tailwind_fixes += tw_count
-            stats.lint_fixes += lint_count
-            stats.files_modified += 1
-            stats.changed_files[rel] = tw_count + lint_count
-            spinner.set_file(rel)
-            spinner.set_counts(stats.total, stats.files_modified)
+        # spawn, not fork: the spinner thread is running, and it's what Windows / macOS use anyway
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures: dict[Future[list[FileScan | None]], list[ScanTask]] = {
+                pool.submit(scan_code_batch, batch, apply, names): batch for batch in batches
+            }
+            for future in as_completed(futures):
+                for (fpath, known, _), scan in zip(futures[future], future.result()):
+                    report(finish(fpath, scan, known))
+    else:
+        for fpath, known, sensitivity in pending:
+            report(finish(fpath, scan_code_file(fpath, apply, known, sensitivity, names), known))
+
+    WRITES.commit()
+    if only_files is None:
+        CACHE.save(live={str(f.relative_to(ROOT)) for f in files})
+    else:
+        CACHE.save()
 
 
 def process_junk_files(apply: bool) -> None:
@@ -1007,6 +1958,7 @@ def process_junk_files(apply: bool) -> None:
                 UNDO.backup(p, "delete")
             try:
                 p.unlink()
+                INDEX.discard(p)
                 stats.files_deleted.append(rel)
             except Exception:
                 pass
@@ -1016,6 +1968,7 @@ def process_junk_files(apply: bool) -> None:
 
 def process_file_renames(apply: bool) -> None:
     spinner.set_phase("rename")
+    renamed: list[tuple[str, str]] = []
     for p in find_files_with_spaces():
         new_path: Path = rename_path_no_spaces(p)
         rel_old = str(p.relative_to(ROOT))
@@ -1024,26 +1977,35 @@ def process_file_renames(apply: bool) -> None:
         if apply:
             try:
                 if UNDO.enabled:
+                    if new_path.is_file():
+                        UNDO.backup(new_path, "modify")  # rename() replaces it
                     UNDO.backup(p, "rename", new_path)
                 p.rename(new_path)
+                INDEX.rename(p, new_path)
                 stats.files_renamed.append((rel_old, rel_new))
-                update_imports_for_rename(p.name, new_path.name)
+                renamed.append((p.name, new_path.name))
             except Exception:
                 pass
         else:
             stats.files_renamed.append((rel_old, rel_new))
+    if renamed:
+        update_imports_for_renames(renamed)
 
 
 def clean_empty_dirs(apply: bool) -> None:
-    for dirpath in sorted(ROOT.rglob("*"), key=lambda p: len(p.parts), reverse=True):
-        if not dirpath.is_dir() or should_skip(dirpath):
-            continue
+    def remove(path: str) -> bool:
+        dirpath = Path(path)
+        if not apply or not SCOPE.covers(dirpath):
+            return False
         try:
-            if not any(dirpath.iterdir()):
-                if apply:
-                    dirpath.rmdir()
-        except Exception:
-            pass
+            dirpath.rmdir()
+        except OSError:
+            return False
+        INDEX.discard(dirpath)
+        return True
+
+    # One post-order pass; directories emptied by removing their children cascade
+    prune_empty_dirs(ROOT, SKIP_DIRS, remove)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1054,18 +2016,84 @@ def clean_empty_dirs(apply: bool) -> None:
 # Directories & files that accumulate stale state
 STALE_TARGETS: list[str] = [
     ".next",                  # Next.js build cache
-    "tsconfig.tsbuildinfo",   # TypeScript incremental build info
+    "tsconfig.tsbuildinfo",   # TypeScript incremental build info (editor / next build; ours is TSC_BUILD_INFO)
     ".tsbuildinfo",           # alt location
     ".eslintcache",           # ESLint cache
     ".swc",                   # SWC compiler cache
 ]
 
 
-def clear_stale_builds(apply: bool) -> None:
-    """Remove stale build caches so the dev server picks up fresh state."""
+# What renames and deletions can leave stale: the persistent module graphs
+# and resolver caches of both bundlers. `npm run dev` runs Turbopack
+# (`next dev --turbo`), which persists under .next/dev/cache/turbopack (Next 16
+# keeps dev output in .next/dev) and .next/cache/turbopack for `next build`;
+# webpack builds use the cacheDirectory next.config.mjs picks per platform.
+# Everything else Next.js, SWC, tsc and ESLint keep is validated against each
+# file's timestamp / content hash on the next compile, so edited files are
+# simply recompiled. Deleting it all made every --apply followed by a cold
+# `next dev` / `next build`.
+RENAME_STALE_TARGETS: list[str] = [
+    ".next/cache/webpack",
+    ".next/cache/webpack-linux",
+    ".next/cache/webpack-windows",
+    ".next/cache/turbopack",
+    ".next/dev/cache/turbopack",
+]
+
+
+def pid_alive(pid: Any) -> bool:
+    if not isinstance(pid, int) or pid <= 0:
+        return False
+    if os.name == "nt":
+        return True  # os.kill(pid, 0) would send CTRL_C_EVENT; callers fail safe on a stale pid
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+# Written by scripts/dev-logger.mjs while `npm run dev` is up
+DEV_SERVER_LOCK: Path = ROOT / ".next" / "dev-server.lock.json"
+
+
+def dev_server_running() -> bool:
+    """True if `npm run dev` holds its lock; its Turbopack cache is in use."""
+    try:
+        pid: Any = json.loads(DEV_SERVER_LOCK.read_text(encoding="utf-8")).get("pid")
+    except (OSError, ValueError, AttributeError):
+        return False
+    return pid_alive(pid)
+
+
+def stale_cache_targets(full: bool) -> tuple[list[str], str]:
+    """Cache entries to remove for what this run changed, and why the rest stays."""
+    if full:
+        return STALE_TARGETS, ""
+    if stats.files_renamed or stats.files_deleted:
+        if dev_server_running():
+            # Deleting a live Turbopack cache corrupts it; the running server
+            # already saw the renames through its file watcher
+            return ([t for t in RENAME_STALE_TARGETS if "turbopack" not in t],
+                    "the dev server is running, so its Turbopack cache stays (it watched the renames)")
+        return RENAME_STALE_TARGETS, "everything but the bundlers' module graphs re-validates moved files itself"
+    if stats.changed_files:
+        return [], f"{len(stats.changed_files)} edited file(s) are re-validated by the compilers"
+    return [], "no files changed"
+
+
+def clear_stale_builds(apply: bool, full: bool = False) -> None:
+    """
+    Remove the build caches this run made stale, so the dev server picks up
+    fresh state without a cold rebuild. full (--full-clear) removes every
+    STALE_TARGETS entry outright.
+    """
     spinner.set_phase("cache")
 
-    for target_name in STALE_TARGETS:
+    targets, stats.cache_kept = stale_cache_targets(full)
+    for target_name in targets:
         target: Path = ROOT / target_name
         spinner.set_file(target_name)
         if not target.exists():
@@ -1088,64 +2116,331 @@ def clear_stale_builds(apply: bool) -> None:
 # SINGLE TSC RUN  (cached — only called ONCE per session for speed)
 # ═══════════════════════════════════════════════════════════════════════════
 
-_tsc_output_cache: str | None = None
-
+_tsc_report: TscDiagnostics | None = None
 
-def run_tsc_once(force: bool = False, timeout: int = 180) -> str:
-    """Run tsc --noEmit and cache the result for this session."""
-    global _tsc_output_cache
-    if _tsc_output_cache is not None and not force:
-        return _tsc_output_cache
+# Incremental state shared by every tsc check. It lives under .bullclean, not
+# among the STALE_TARGETS, so the post-fix checks re-use the baseline's work
+# (and the next clean.py run re-uses this one's): only files that changed,
+# and their dependents, are re-checked.
+TSC_BUILD_INFO: Path = ROOT / ".bullclean" / "tsc.tsbuildinfo"
+_tsc_incremental = True
 
-    spinner.set_phase("errors")
-    spinner.set_file("tsc --noEmit")
 
+def tsc_command(build_info: Path | None) -> list[str]:
     tsc_bin: Path = ROOT / "node_modules" / ".bin" / "tsc"
     cmd: list[str] = [str(tsc_bin), "--noEmit"] if tsc_bin.exists() else ["npx", "tsc", "--noEmit"]
+    if build_info is not None:
+        cmd += ["--incremental", "--tsBuildInfoFile", str(build_info)]
+    return cmd
+
+
+def disable_tsc_incremental() -> None:
+    """Cold checks from scratch (--tsc-cold); the saved build info is left alone."""
+    global _tsc_incremental
+    _tsc_incremental = False
+
+
+# (file relative to ROOT as tsc prints it, or None for global errors; line; column; TS code; message)
+TscDiagnostic = tuple[str | None, int, int, int, str]
+
+# "app/page.tsx(12,5): error TS2322: Type 'string' is not assignable…", or a
+# global "error TS5023: Unknown compiler option…" (tsc --pretty false, the
+# default when stdout is not a terminal)
+_RE_TSC_DIAGNOSTIC: Pattern[str] = re.compile(r'^(?:(.+?)\((\d+),(\d+)\):\s*)?error TS(\d+):\s?(.*)$')
+_RE_TSC_SUMMARY: Pattern[str] = re.compile(r'Found\s+(\d+)\s+error')
+
+
+class TscDiagnostics:
+    """
+    Structured errors from one tsc run, parsed line by line as tsc prints them.
+
+    Every consumer (error counts, error files, TS2578 removal, TS7016 type
+    installs) queries this index instead of running its own regex over the
+    captured output, which on a broken tree can be megabytes: only the
+    diagnostics are kept, never the raw text. Indented continuation lines
+    (message chains) are folded into the message of the error above them.
+    """
+
+    def __init__(self) -> None:
+        self.diagnostics: list[TscDiagnostic] = []
+        self.by_code: dict[int, list[int]] = {}
+        self.summary: int | None = None    # "Found N errors", when tsc prints it
+        self.bytes_read = 0
+        self.held = 0                      # approximate bytes of diagnostics kept
+        self.peak = 0                      # most bytes held at once, including the line being parsed
+        self.parse_time = 0.0
+        self._names: dict[str, str] = {}   # one string per file name, however many errors it has
+
+    def _add(self, diagnostic: TscDiagnostic) -> None:
+        fname: str | None = diagnostic[0]
+        if fname is not None:
+            if fname not in self._names:
+                self._names[fname] = fname
+                self.held += sys.getsizeof(fname)
+            diagnostic = (self._names[fname], *diagnostic[1:])
+        self.by_code.setdefault(diagnostic[3], []).append(len(self.diagnostics))
+        self.diagnostics.append(diagnostic)
+        self.held += sys.getsizeof(diagnostic) + sys.getsizeof(diagnostic[4])
+
+    def feed(self, line: str) -> None:
+        t0: float = time.perf_counter()
+        self.bytes_read += len(line)
+        line = line.rstrip("\r\n")
+        m: Match[str] | None = _RE_TSC_DIAGNOSTIC.match(line)
+        if m:
+            fname, lineno, col, code, message = m.groups()
+            self._add((fname, int(lineno or 0), int(col or 0), int(code), message))
+        elif line[:1].isspace() and line.strip() and self.diagnostics:
+            fname, lineno, col, code, message = self.diagnostics[-1]
+            self.diagnostics[-1] = (fname, lineno, col, code, f"{message}\n{line.strip()}")
+            self.held += len(line)
+        else:
+            summary: Match[str] | None = _RE_TSC_SUMMARY.search(line)
+            if summary:
+                self.summary = int(summary.group(1))
+        self.peak = max(self.peak, self.held + sys.getsizeof(line))
+        self.parse_time += time.perf_counter() - t0
+
+    def feed_all(self, lines: Iterable[str]) -> TscDiagnostics:
+        for line in lines:
+            self.feed(line)
+        return self
+
+    def merged(self, fresh: TscDiagnostics, scope: Iterable[str]) -> TscDiagnostics:
+        """
+        This report with the files in `scope` and the file-less diagnostics
+        taken from `fresh` (a partial daemon reply); files that no longer
+        exist (renamed or deleted since) drop out.
+        """
+        replaced: set[str] = set(scope)
+        exists: dict[str, bool] = {}
+        report = TscDiagnostics()
+        for diagnostic in self.diagnostics:
+            fname: str | None = diagnostic[0]
+            if fname is None or fname in replaced:
+                continue
+            if fname not in exists:
+                exists[fname] = (ROOT / fname).exists()
+            if exists[fname]:
+                report._add(diagnostic)
+        for diagnostic in fresh.diagnostics:
+            report._add(diagnostic)
+        report.bytes_read, report.parse_time = fresh.bytes_read, fresh.parse_time
+        report.peak = max(report.held, fresh.peak)
+        return report
+
+    def __bool__(self) -> bool:
+        return bool(self.diagnostics) or bool(self.summary)
 
+    @property
+    def error_count(self) -> int:
+        return self.summary if self.summary is not None else len(self.diagnostics)
+
+    def of_code(self, code: int) -> list[TscDiagnostic]:
+        return [self.diagnostics[i] for i in self.by_code.get(code, [])]
+
+    def error_files(self) -> set[Path]:
+        files: set[Path] = set()
+        for fname in self._names:
+            fpath = Path(fname)
+            if not fpath.is_absolute():
+                fpath = ROOT / fpath
+            if fpath.exists():
+                files.add(fpath)
+        return files
+
+
+class TscDaemon:
+    """
+    Client for scripts/tsc-daemon.mjs (--tsc-daemon): a Node process that keeps
+    the TypeScript program in memory and outlives clean.py, so every check
+    after the first — in this run or the next — only re-parses and re-checks
+    what changed. Found through .bullclean/tsc-daemon.json (port + token);
+    started detached on first use. Any failure falls back to the tsc CLI.
+
+    After the first check of a run, later checks send the files clean.py has
+    changed and get back only the diagnostics that can differ (those files
+    plus whatever the daemon re-checked), merged into the previous report.
+    A daemon that is busy building its program does not answer pings; a
+    live pid in the state file still counts as started.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.script: Path = root / "scripts" / "tsc-daemon.mjs"
+        self.state_path: Path = root / ".bullclean" / "tsc-daemon.json"
+        self.log_path: Path = root / ".bullclean" / "tsc-daemon.log"
+        self.enabled = False
+        self.error: str = ""
+        self.last: dict[str, Any] = {}
+        self.report: TscDiagnostics | None = None  # full result of check #generation
+        self.generation: int = -1
+
+    def _state(self) -> dict[str, Any] | None:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _request(state: dict[str, Any], payload: dict[str, Any], timeout: float) -> dict[str, Any]:
+        with socket.create_connection(("127.0.0.1", int(state["port"])), timeout=timeout) as conn:
+            conn.sendall((json.dumps({**payload, "token": state["token"]}) + "\n").encode("utf-8"))
+            chunks: list[bytes] = []
+            while not chunks or not chunks[-1].endswith(b"\n"):
+                chunk: bytes = conn.recv(1 << 16)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return json.loads(b"".join(chunks) or b"{}")
+
+    def _alive(self) -> dict[str, Any] | None:
+        state: dict[str, Any] | None = self._state()
+        if state is None:
+            return None
+        try:
+            if self._request(state, {"cmd": "ping"}, timeout=2).get("ok"):
+                return state
+        except (OSError, ValueError, KeyError):
+            pass
+        # No answer: a daemon building its program cannot reply until it is done
+        return state if pid_alive(state.get("pid")) else None
+
+    def start(self, wait: float = 15.0) -> dict[str, Any] | None:
+        state: dict[str, Any] | None = self._alive()
+        if state is not None:
+            return state
+        node: str | None = shutil.which("node")
+        if node is None:
+            self.error = "node not found"
+            return None
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        detach: dict[str, Any] = (
+            {"creationflags": getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)}
+            if os.name == "nt" else {"start_new_session": True}
+        )
+        with open(self.log_path, "a", encoding="utf-8") as log:
+            proc: subprocess.Popen[bytes] = subprocess.Popen(
+                [node, str(self.script)], cwd=str(self.script.parent.parent),
+                stdin=subprocess.DEVNULL, stdout=log, stderr=log, **detach,
+            )
+        # Up as soon as it has written its state file; it may still be building
+        deadline: float = time.monotonic() + wait
+        while time.monotonic() < deadline and proc.poll() is None:
+            time.sleep(0.1)
+            state = self._state()
+            if state is not None and state.get("pid") == proc.pid:
+                return state
+        self.error = f"daemon did not start — see {self.log_path.relative_to(ROOT)}"
+        return None
+
+    def check(self, timeout: int, changed: Iterable[str] = ()) -> TscDiagnostics | None:
+        """Diagnostics for the whole project, or None (use the CLI)."""
+        state: dict[str, Any] | None = self.start()
+        if state is None:
+            return None
+        payload: dict[str, Any] = {"cmd": "check"}
+        if self.report is not None:
+            payload.update(files=sorted(changed), since=self.generation)
+        try:
+            reply: dict[str, Any] = self._request(state, payload, timeout=timeout)
+        except (OSError, ValueError) as e:
+            self.error = f"check failed: {e}"
+            return None
+        if not reply.get("ok"):
+            self.error = str(reply.get("error", "check failed"))
+            return None
+        self.last = reply
+        report = TscDiagnostics().feed_all(reply["output"].splitlines())
+        if reply.get("partial") and self.report is not None:
+            report = self.report.merged(report, reply.get("scope", []))
+        self.report, self.generation = report, int(reply.get("generation", -1))
+        return report
+
+    def stop(self) -> bool:
+        state: dict[str, Any] | None = self._alive()
+        if state is None:
+            return False
+        try:
+            self._request(state, {"cmd": "stop"}, timeout=5)
+        except (OSError, ValueError):
+            # Busy building: it shuts down on SIGTERM once the build returns
+            if os.name != "nt":
+                try:
+                    os.kill(int(state["pid"]), signal.SIGTERM)
+                except (OSError, ValueError, KeyError):
+                    pass
+        return True
+
+
+TSC_DAEMON = TscDaemon(ROOT)
+
+
+def run_tsc_once(force: bool = False, timeout: int = 180) -> TscDiagnostics:
+    """Run tsc --noEmit and cache the parsed diagnostics for this session."""
+    global _tsc_report
+    if _tsc_report is not None and not force:
+        return _tsc_report
+
+    spinner.set_phase("errors")
+    if TSC_DAEMON.enabled:
+        spinner.set_file("tsc daemon")
+        daemon_report: TscDiagnostics | None = TSC_DAEMON.check(timeout, changed=stats.changed_files)
+        if daemon_report is not None:
+            _tsc_report = daemon_report
+            stats.tsc_parsed.append((_tsc_report.bytes_read, _tsc_report.parse_time, _tsc_report.peak))
+            return _tsc_report
+        TSC_DAEMON.enabled = False  # fall back to the CLI for the rest of the run
+
+    spinner.set_file("tsc --noEmit --incremental" if _tsc_incremental else "tsc --noEmit")
+
+    cmd: list[str] = tsc_command(TSC_BUILD_INFO if _tsc_incremental else None)
+    if _tsc_incremental:
+        TSC_BUILD_INFO.parent.mkdir(parents=True, exist_ok=True)
+
+    # Parsed while tsc is still printing; the raw output is never held in full
+    report = TscDiagnostics()
     try:
-        result: subprocess.CompletedProcess[str] = subprocess.run(
-            cmd, cwd=str(ROOT), capture_output=True, text=True, timeout=timeout,
+        proc: subprocess.Popen[str] = subprocess.Popen(
+            cmd, cwd=str(ROOT), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding="utf-8", errors="replace",
         )
-        _tsc_output_cache = result.stdout + result.stderr
-    except (FileNotFoundError, subprocess.TimeoutExpired, Exception):
-        _tsc_output_cache = ""
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                report.feed(line)
+            proc.wait()
+        finally:
+            timer.cancel()
+        if proc.returncode < 0:
+            report = TscDiagnostics()  # killed on timeout: a partial list is no baseline
+    except Exception:
+        report = TscDiagnostics()
 
-    return _tsc_output_cache
+    stats.tsc_parsed.append((report.bytes_read, report.parse_time, report.peak))
+    _tsc_report = report
+    return _tsc_report
 
 
 def invalidate_tsc_cache() -> None:
     """Force a fresh tsc run on next call."""
-    global _tsc_output_cache
-    _tsc_output_cache = None
+    global _tsc_report
+    _tsc_report = None
 
 
-def _count_tsc_errors(output: str) -> int:
-    error_match: re.Match[str] | None = re.search(r'Found\s+(\d+)\s+error', output)
-    if error_match:
-        return int(error_match.group(1))
-    return len(re.findall(r'error TS\d+', output))
+def _count_tsc_errors(report: TscDiagnostics) -> int:
+    return report.error_count
 
 
-def extract_tsc_error_files(output: str) -> set[Path]:
-    files: set[Path] = set()
-    if not output:
-        return files
-    pattern: Pattern[str] = re.compile(r'^(.+?)\(\d+,\d+\):\s*error TS\d+:', re.MULTILINE)
-    for m in pattern.finditer(output):
-        fpath = Path(m.group(1))
-        if not fpath.is_absolute():
-            fpath: Path = ROOT / fpath
-        if fpath.exists():
-            files.add(fpath)
-    return files
+def extract_tsc_error_files(report: TscDiagnostics) -> set[Path]:
+    return report.error_files()
 
 
-def recheck_errors(force: bool = False) -> str:
+def recheck_errors(force: bool = False) -> TscDiagnostics:
     """Run tsc --noEmit to re-check for type errors after all fixes."""
-    output: str = run_tsc_once(force=force)
-    stats.ts_errors = _count_tsc_errors(output)
-    return output
+    report: TscDiagnostics = run_tsc_once(force=force)
+    stats.ts_errors = _count_tsc_errors(report)
+    return report
 
 
 def remove_unused_ts_expect_errors(apply: bool) -> None:
@@ -1153,18 +2448,14 @@ def remove_unused_ts_expect_errors(apply: bool) -> None:
     spinner.set_phase("errors")
     spinner.set_file("Scanning for stale @ts-expect-error…")
 
-    output: str = run_tsc_once()
-    if not output:
-        return
+    report: TscDiagnostics = run_tsc_once()
 
-    # Parse TS2578 errors: "file.tsx(123,5): error TS2578: Unused '@ts-expect-error' directive."
-    pattern: Pattern[str] = re.compile(r'^(.+?)\((\d+),\d+\):\s*error TS2578:', re.MULTILINE)
+    # TS2578: "file.tsx(123,5): error TS2578: Unused '@ts-expect-error' directive."
     # Group by file → set of 1-based line numbers
     removals: dict[str, set[int]] = {}
-    for m in pattern.finditer(output):
-        fpath_str: str = m.group(1)
-        lineno = int(m.group(2))
-        removals.setdefault(fpath_str, set()).add(lineno)
+    for fpath_str, lineno, _, _, _ in report.of_code(2578):
+        if fpath_str is not None:
+            removals.setdefault(fpath_str, set()).add(lineno)
 
     if not removals:
         return
@@ -1199,7 +2490,8 @@ def remove_unused_ts_expect_errors(apply: bool) -> None:
         if apply:
             if UNDO.enabled:
                 UNDO.backup(fpath, "modify")
-            fpath.write_text('\n'.join(new_lines), encoding="utf-8")
+            WRITES.write(fpath, '\n'.join(new_lines))
+    WRITES.commit()
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1260,13 +2552,14 @@ def install_missing_types() -> None:
     spinner.set_phase("errors")
     spinner.set_file("Checking for missing type packages…")
 
-    output: str = run_tsc_once()
-    if not output:
-        return
+    report: TscDiagnostics = run_tsc_once()
 
-    # Find TS7016 errors: "Could not find a declaration file for module 'bcryptjs'"
+    # TS7016: "Could not find a declaration file for module 'bcryptjs'"
     missing: set[str] = set()
-    for m in re.finditer(r"error TS7016.*?module '([^']+)'", output):
+    for *_, message in report.of_code(7016):
+        m: Match[str] | None = re.search(r"module '([^']+)'", message.split("\n", 1)[0])
+        if not m:
+            continue
         module_name: str = m.group(1).split("/")[0]
         if module_name in _TYPE_PACKAGES:
             missing.add(_TYPE_PACKAGES[module_name])
@@ -1352,6 +2645,152 @@ def launch_popup() -> None:
                 continue
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# PROFILING  (--profile / --compare)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class RunProfile:
+    """
+    Wall time, CPU time (this process plus finished children: rewrite
+    workers, tsc, next build) and files touched for each phase of main().
+
+    With --profile the report is saved as .bullclean/profiles/<time>.json
+    (the newest 20 are kept) and printed; --compare diffs two reports.
+    --cprofile also dumps a cProfile of the rewrite phase, which then runs
+    in this process so the profile sees the rules rather than a pool wait.
+    """
+
+    KEEP = 20
+
+    def __init__(self, root: Path) -> None:
+        self.dir: Path = root / ".bullclean" / "profiles"
+        self.enabled = False
+        self.cprofile_path: Path | None = None
+        self.profiling = False     # a cProfile is running: keep the rewrite phase in-process
+        self.phases: list[dict[str, Any]] = []
+        self.workers = 1           # most rewrite processes any pass actually ran
+
+    @staticmethod
+    def _cpu() -> float:
+        t: os.times_result = os.times()
+        return t.user + t.system + t.children_user + t.children_system
+
+    @staticmethod
+    def _touched() -> int:
+        return stats.files_modified + len(stats.files_deleted) + len(stats.files_renamed)
+
+    @contextmanager
+    def phase(self, name: str, cprofile: bool = False) -> Iterator[None]:
+        profiler: Any = None
+        if cprofile and self.cprofile_path is not None:
+            import cProfile
+            profiler = cProfile.Profile()
+            self.profiling = True
+            profiler.enable()
+        wall, cpu, touched = time.perf_counter(), self._cpu(), self._touched()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self.profiling = False
+                self.cprofile_path.parent.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(str(self.cprofile_path))
+            self.phases.append({
+                "name": name,
+                "wall": round(time.perf_counter() - wall, 4),
+                "cpu": round(self._cpu() - cpu, 4),
+                "files": self._touched() - touched,
+            })
+
+    def save(self, argv: list[str]) -> Path | None:
+        payload: dict[str, Any] = {
+            "created": time.time(),
+            "argv": argv,
+            "python": platform.python_version(),
+            "workers": self.workers,
+            "wall": round(sum(p["wall"] for p in self.phases), 4),
+            "cpu": round(sum(p["cpu"] for p in self.phases), 4),
+            "phases": self.phases,
+            "cprofile": str(self.cprofile_path.relative_to(ROOT)) if self.cprofile_path else None,
+        }
+        path: Path = self.dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+        try:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        except OSError:
+            return None
+        for old in self.reports()[:-self.KEEP]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def wall_by_phase(self) -> dict[str, float]:
+        """Wall seconds per phase name (a phase that runs twice is summed), for the run summary."""
+        walls: dict[str, float] = {}
+        for p in self.phases:
+            walls[p["name"]] = walls.get(p["name"], 0.0) + p["wall"]
+        return walls
+
+    def reports(self) -> list[Path]:
+        """Saved reports, oldest first."""
+        try:
+            return sorted(self.dir.glob("*.json"))
+        except OSError:
+            return []
+
+    def print_table(self) -> None:
+        print(f"  {C.AMBER}Phase timings:{C.RESET}  {C.DIM}({self.workers} rewrite worker(s)){C.RESET}")
+        print(f"    {C.DIM}{'phase':<16} {'wall':>9} {'cpu':>9} {'files':>6}{C.RESET}")
+        for p in self.phases:
+            print(f"    {p['name']:<16} {p['wall']:>8.2f}s {p['cpu']:>8.2f}s {p['files']:>6}")
+        print()
+
+    def compare(self, paths: list[str]) -> None:
+        """Per-phase wall time of `new` against `old` (default: the two newest reports)."""
+        if paths and len(paths) != 2:
+            warn("--compare takes two report paths, or none for the two newest")
+            return
+        chosen: list[Path] = [Path(p) for p in paths] if paths else self.reports()[-2:]
+        if len(chosen) < 2:
+            warn(f"Need two reports to compare — run clean.py --profile twice ({self.dir.relative_to(ROOT)})")
+            return
+        try:
+            old, new = (json.loads(p.read_text(encoding="utf-8")) for p in chosen)
+        except (OSError, ValueError) as e:
+            warn(f"Could not read profile report: {e}")
+            return
+
+        print(f"  {C.DIM}{chosen[0].name}  →  {chosen[1].name}{C.RESET}\n")
+        print(f"    {C.DIM}{'phase':<16} {'before':>9} {'after':>9} {'change':>9}{C.RESET}")
+        before: dict[str, float] = {p["name"]: p["wall"] for p in old.get("phases", [])}
+        after: dict[str, float] = {p["name"]: p["wall"] for p in new.get("phases", [])}
+        rows: list[tuple[str, float | None, float | None]] = [(n, before.get(n), after.get(n)) for n in after]
+        rows += [(n, before[n], None) for n in before if n not in after]
+        rows.append(("total", old.get("wall"), new.get("wall")))
+        regressions = 0
+        for name, b, a in rows:
+            if b is None or a is None:
+                change: str = f"{C.DIM}{'new' if b is None else 'gone':>9}{C.RESET}"
+            else:
+                delta: float = a - b
+                # Noise floor: under 50ms or 10% is not worth flagging
+                slower: bool = delta > 0.05 and delta > 0.10 * b
+                faster: bool = -delta > 0.05 and -delta > 0.10 * b
+                colour: str = C.RED if slower else C.GREEN if faster else C.DIM
+                change = f"{colour}{delta:>+8.2f}s{C.RESET}"
+                regressions += slower and name != "total"
+            fmt: Callable[[float | None], str] = lambda v: f"{v:>8.2f}s" if v is not None else f"{'—':>9}"
+            print(f"    {name:<16} {fmt(b)} {fmt(a)} {change}")
+        print()
+        if regressions:
+            warn(f"{regressions} phase(s) slower by more than 10%")
+        else:
+            success("No phase regressed by more than 10%")
+
+
+PROFILE = RunProfile(ROOT)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1362,10 +2801,21 @@ def main() -> None:
     parser.add_argument("--apply", action="store_true", help="Apply changes")
     parser.add_argument("--no-tsc", action="store_true", help="Skip tsc checks")
     parser.add_argument("--tsc-timeout", type=int, default=180, help="tsc timeout in seconds")
+    parser.add_argument("--tsc-cold", action="store_true", help="Type-check from scratch, ignoring .bullclean/tsc.tsbuildinfo")
+    parser.add_argument("--tsc-daemon", action="store_true", help="Type-check through a long-lived tsc daemon (started if needed)")
+    parser.add_argument("--tsc-daemon-stop", action="store_true", help="Stop the tsc daemon and exit")
     parser.add_argument("--popup", action="store_true", help="Open in a new native terminal window")
     parser.add_argument("--no-popup", action="store_true", help=argparse.SUPPRESS)  # internal
     parser.add_argument("--deploy", action="store_true", help="Full deploy check (tsc + next build)")
-    parser.add_argument("--undo", action="store_true", help="Undo last clean.py changes")
+    parser.add_argument("--undo", action="store_true", help="Undo the last clean.py run (repeat to step back through older runs)")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--changed", action="store_true", help="Only touch files changed vs HEAD (plus untracked)")
+    scope.add_argument("--since", metavar="REF", help="Only touch files changed since a git ref (plus untracked)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every file, ignoring .bullclean/rewrite-cache.json")
+    parser.add_argument("--full-clear", action="store_true", help="Delete all of .next, .swc and tsbuildinfo instead of only the stale entries")
+    parser.add_argument("--profile", action="store_true", help="Time every phase and save a report under .bullclean/profiles")
+    parser.add_argument("--cprofile", action="store_true", help="With --profile: also dump a cProfile of the rewrite phase")
+    parser.add_argument("--compare", nargs="*", metavar="REPORT", help="Compare two --profile reports (default: the two newest) and exit")
     args: argparse.Namespace = parser.parse_args()
 
     # If --popup, re-launch in a native terminal window and exit
@@ -1378,6 +2828,18 @@ def main() -> None:
         UNDO.apply_undo()
         return
 
+    if args.compare is not None:
+        print_header("PROFILE COMPARE")
+        PROFILE.compare(args.compare)
+        return
+
+    if args.tsc_daemon_stop:
+        if TSC_DAEMON.stop():
+            success("tsc daemon stopped")
+        else:
+            warn("No tsc daemon running")
+        return
+
     apply: Any | bool = args.apply and not args.dry
     mode_label: str = "APPLY" if apply else "DRY-RUN"
     if args.deploy:
@@ -1396,76 +2858,105 @@ def main() -> None:
     print(f"  {C.DIM}Python {py_ver}  │  {os_name} {platform.machine()}  │  {ROOT.name}/{C.RESET}")
     print()
 
+    if args.changed or args.since:
+        if not SCOPE.load_from_git(args.since or "HEAD"):
+            return
+        print(f"  {C.AMBER}◆{C.RESET}  Scoped to {C.GOLD_B}{len(SCOPE.files)}{C.RESET} path(s) changed since {C.CYAN}{SCOPE.label}{C.RESET} (incl. untracked)")
+        print()
+
     if apply:
         if prompt_yes_no("Enable undo backups for this run?", default=False):
             UNDO.enable()
 
+    PROFILE.enabled = args.profile or args.cprofile
+    if args.cprofile:
+        PROFILE.cprofile_path = ROOT / ".bullclean" / "profiles" / "rewrite.prof"
+
     t0: float = time.time()
     spinner.start()
 
     tsc_enabled: bool = not args.no_tsc
-    baseline_output: str = ""
+    if args.tsc_cold:
+        disable_tsc_incremental()
+    TSC_DAEMON.enabled = tsc_enabled and args.tsc_daemon
     baseline_error_files: set[Path] = set()
     if apply and tsc_enabled:
-        baseline_output: str = run_tsc_once(force=True, timeout=args.tsc_timeout)
-        baseline_error_files = extract_tsc_error_files(baseline_output)
+        with PROFILE.phase("tsc baseline"):
+            baseline_error_files = extract_tsc_error_files(run_tsc_once(force=True, timeout=args.tsc_timeout))
 
     try:
+        # Phase 0: Walk the repo once; every phase below queries this index
+        spinner.set_phase("scan")
+        with PROFILE.phase("scan"):
+            INDEX.scan()
+            CACHE.enabled = not args.no_cache
+            CACHE.load()
+
         # Phase 1: Fix code (parallel)
-        process_code_files(apply)
+        with PROFILE.phase("rewrite", cprofile=True):
+            process_code_files(apply, only_files=SCOPE.files if SCOPE.active else None)
 
         # Phase 2: Delete junk
-        process_junk_files(apply)
+        with PROFILE.phase("junk"):
+            process_junk_files(apply)
 
         # Phase 3: Rename files
-        process_file_renames(apply)
+        with PROFILE.phase("renames"):
+            process_file_renames(apply)
 
         if apply:
             # Phase 4: Clean empty dirs
-            clean_empty_dirs(apply)
+            with PROFILE.phase("empty dirs"):
+                clean_empty_dirs(apply)
 
             # Phase 5: Clear stale builds & caches
-            clear_stale_builds(apply)
+            with PROFILE.phase("caches"):
+                clear_stale_builds(apply, full=args.full_clear)
 
             if tsc_enabled:
-                # Phase 6: Run tsc ONCE, then process results
-                tsc_output: str = run_tsc_once(force=True, timeout=args.tsc_timeout)
-                new_error_files: set[Path] = extract_tsc_error_files(tsc_output)
-
-                # If new error files appeared, re-run fixes only for those files
-                introduced_files: set[Path] = new_error_files - baseline_error_files
-                if introduced_files:
-                    process_code_files(apply, only_files=introduced_files)
-                    invalidate_tsc_cache()
-                    tsc_output: str = run_tsc_once(force=True, timeout=args.tsc_timeout)
-
-                # Phase 7: Auto-install missing type packages (uses cached tsc)
-                types_before: int = stats.lint_fixes
-                install_missing_types()
-
-                # Phase 8: Remove unused @ts-expect-error (uses cached tsc)
-                expect_before: int = stats.lint_fixes
-                remove_unused_ts_expect_errors(apply)
-                phase78_changed: bool = (stats.lint_fixes != types_before) or (stats.lint_fixes != expect_before)
-
-                # Phase 9: Re-run tsc only if phases 7-8 made changes
-                if phase78_changed:
-                    invalidate_tsc_cache()  # force fresh check
-                    tsc_output: str = run_tsc_once(force=True, timeout=args.tsc_timeout)
-                stats.ts_errors = _count_tsc_errors(tsc_output)
+                with PROFILE.phase("tsc + fixes"):
+                    # Phase 6: Run tsc ONCE, then process results
+                    tsc_output: TscDiagnostics = run_tsc_once(force=True, timeout=args.tsc_timeout)
+                    new_error_files: set[Path] = extract_tsc_error_files(tsc_output)
+
+                    # If new error files appeared, re-run fixes only for those files
+                    introduced_files: set[Path] = new_error_files - baseline_error_files
+                    if introduced_files:
+                        process_code_files(apply, only_files=introduced_files)
+                        invalidate_tsc_cache()
+                        tsc_output: TscDiagnostics = run_tsc_once(force=True, timeout=args.tsc_timeout)
+
+                    # Phase 7: Auto-install missing type packages (uses cached tsc)
+                    types_before: int = stats.lint_fixes
+                    install_missing_types()
+
+                    # Phase 8: Remove unused @ts-expect-error (uses cached tsc)
+                    expect_before: int = stats.lint_fixes
+                    remove_unused_ts_expect_errors(apply)
+                    phase78_changed: bool = (stats.lint_fixes != types_before) or (stats.lint_fixes != expect_before)
+
+                    # Phase 9: Re-run tsc only if phases 7-8 made changes
+                    if phase78_changed:
+                        invalidate_tsc_cache()  # force fresh check
+                        tsc_output: TscDiagnostics = run_tsc_once(force=True, timeout=args.tsc_timeout)
+                    stats.ts_errors = _count_tsc_errors(tsc_output)
             else:
                 stats.ts_errors = None
 
             # Phase 10: Deploy check (optional)
             if args.deploy:
-                deploy_check()
+                with PROFILE.phase("deploy"):
+                    deploy_check()
 
             # Phase 11: Trigger browser hot-reload
-            trigger_hot_reload()
+            with PROFILE.phase("hot reload"):
+                trigger_hot_reload()
     finally:
         spinner.set_phase("done")
         time.sleep(0.3)
         spinner.stop()
+        stats.phase_times = PROFILE.wall_by_phase()
+        WRITES.discard()  # only non-empty if a phase was interrupted before its commit
         if UNDO.enabled:
             UNDO.write_manifest()
 
@@ -1473,6 +2964,25 @@ def main() -> None:
 
     stats.report()
 
+    if UNDO.enabled and UNDO.entries:
+        print(f"  {C.GREEN}⚡{C.RESET}  {C.DIM}Undo snapshot: {len(UNDO.entries)} file(s), {UNDO.stored} new blob(s), "
+              f"{UNDO.deduped} already stored (.bullclean/undo){C.RESET}")
+
+    if PROFILE.enabled:
+        print()
+        PROFILE.print_table()
+        report_path: Path | None = PROFILE.save(sys.argv[1:])
+        if report_path is not None:
+            print(f"  {C.DIM}Profile saved to {report_path.relative_to(ROOT)} — compare runs with --compare{C.RESET}")
+        if PROFILE.cprofile_path is not None:
+            print(f"  {C.DIM}Rewrite-phase cProfile: {PROFILE.cprofile_path.relative_to(ROOT)} (python3 -m pstats){C.RESET}")
+
+    if TSC_DAEMON.error:
+        warn(f"tsc daemon unavailable ({TSC_DAEMON.error}) — used the tsc CLI")
+    elif TSC_DAEMON.last:
+        last: dict[str, Any] = TSC_DAEMON.last
+        print(f"  {C.GREEN}⚡{C.RESET}  {C.DIM}tsc daemon re-checked {len(last['checked'])} of {last['files']} file(s) in {last['ms']}ms{C.RESET}")
+
     # Final banner
     print(DIVIDER)
     print(f"  {C.GREEN}✔{C.RESET}  {gold_bold('Done')} in {C.GOLD}{elapsed:.1f}s{C.RESET}  🐂")
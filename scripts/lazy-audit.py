@@ -22,6 +22,8 @@ import re
 import sys
 from pathlib import Path
 
+from repo_walk import iter_files
+
 # ═══════════════════════════════════════════════════════════════════════════
 # COLORS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -110,10 +112,6 @@ SCRIPT_PATTERNS = [
 ]
 
 
-def should_skip(path: Path) -> bool:
-    return any(part in SKIP_DIRS for part in path.parts)
-
-
 # ═══════════════════════════════════════════════════════════════════════════
 # ANALYSIS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -213,14 +211,9 @@ def analyze_all(strict: bool = False) -> list[dict]:
     """Scan entire codebase for lazy-loading opportunities."""
     all_issues = []
 
-    for ext in CODE_EXTS:
-        for fpath in sorted(ROOT.rglob(f"*{ext}")):
-            if should_skip(fpath):
-                continue
-            if not fpath.is_file():
-                continue
-            issues = analyze_file(fpath, strict)
-            all_issues.extend(issues)
+    for fpath in sorted(iter_files(ROOT, SKIP_DIRS, CODE_EXTS)):
+        issues = analyze_file(fpath, strict)
+        all_issues.extend(issues)
 
     return all_issues
 
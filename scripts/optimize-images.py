@@ -24,6 +24,8 @@ import subprocess
 import sys
 from pathlib import Path
 
+from repo_walk import iter_files
+
 # ═══════════════════════════════════════════════════════════════════════════
 # COLORS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -73,10 +75,6 @@ def fmt_size(size_bytes: int) -> str:
     return f"{size_bytes} B"
 
 
-def should_skip(path: Path) -> bool:
-    return any(part in SKIP_DIRS for part in path.parts)
-
-
 # ═══════════════════════════════════════════════════════════════════════════
 # AUDIT: Public images
 # ═══════════════════════════════════════════════════════════════════════════
@@ -97,13 +95,9 @@ def audit_public_images() -> dict:
     if not PUBLIC.exists():
         return results
 
-    for img in sorted(PUBLIC.rglob("*")):
-        if not img.is_file():
-            continue
+    for img in sorted(iter_files(PUBLIC, SKIP_DIRS)):
         if img.suffix.lower() not in ALL_IMAGE_EXTS:
             continue
-        if should_skip(img):
-            continue
 
         size = img.stat().st_size
         ext = img.suffix.lower()
@@ -194,47 +188,44 @@ def audit_code_images() -> list[dict]:
     height_re = re.compile(r'\bheight\s*=')
     loading_re = re.compile(r'\bloading\s*=\s*["\']lazy["\']')
 
-    for ext in CODE_EXTS:
-        for fpath in sorted(ROOT.rglob(f"*{ext}")):
-            if should_skip(fpath):
-                continue
-            try:
-                content = fpath.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                continue
+    for fpath in sorted(iter_files(ROOT, SKIP_DIRS, CODE_EXTS)):
+        try:
+            content = fpath.read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            continue
 
-            img_matches = list(img_tag_re.finditer(content))
-            if not img_matches:
-                continue
+        img_matches = list(img_tag_re.finditer(content))
+        if not img_matches:
+            continue
 
-            has_next_image = bool(next_image_re.search(content))
-            rel = str(fpath.relative_to(ROOT))
-
-            lines = content.split('\n')
-            for match in img_matches:
-                line_num = content[:match.start()].count('\n') + 1
-                # Get surrounding context (the whole tag, roughly)
-                tag_end = content.find('>', match.start())
-                if tag_end == -1:
-                    tag_end = match.start() + 200
-                tag_text = content[match.start():tag_end + 1]
-
-                missing = []
-                if not alt_re.search(tag_text):
-                    missing.append("alt")
-                if not width_re.search(tag_text):
-                    missing.append("width")
-                if not height_re.search(tag_text):
-                    missing.append("height")
-                if not loading_re.search(tag_text):
-                    missing.append("loading=lazy")
-
-                issues.append({
-                    "file": rel,
-                    "line": line_num,
-                    "has_next_image_import": has_next_image,
-                    "missing_attrs": missing,
-                })
+        has_next_image = bool(next_image_re.search(content))
+        rel = str(fpath.relative_to(ROOT))
+
+        lines = content.split('\n')
+        for match in img_matches:
+            line_num = content[:match.start()].count('\n') + 1
+            # Get surrounding context (the whole tag, roughly)
+            tag_end = content.find('>', match.start())
+            if tag_end == -1:
+                tag_end = match.start() + 200
+            tag_text = content[match.start():tag_end + 1]
+
+            missing = []
+            if not alt_re.search(tag_text):
+                missing.append("alt")
+            if not width_re.search(tag_text):
+                missing.append("width")
+            if not height_re.search(tag_text):
+                missing.append("height")
+            if not loading_re.search(tag_text):
+                missing.append("loading=lazy")
+
+            issues.append({
+                "file": rel,
+                "line": line_num,
+                "has_next_image_import": has_next_image,
+                "missing_attrs": missing,
+            })
 
     return issues
 
@@ -326,10 +317,8 @@ def convert_to_webp(apply: bool):
     converted = 0
     saved_bytes = 0
 
-    for img in sorted(PUBLIC.rglob("*")):
-        if not img.is_file() or img.suffix.lower() not in IMAGE_EXTS:
-            continue
-        if should_skip(img):
+    for img in sorted(iter_files(PUBLIC, SKIP_DIRS)):
+        if img.suffix.lower() not in IMAGE_EXTS:
             continue
 
         webp_path = img.with_suffix(".webp")
@@ -10,6 +10,8 @@
 ║    python scripts/push_sender.py --test       # Send test push       ║
 ║    python scripts/push_sender.py --status     # Check system status  ║
 ║    python scripts/push_sender.py --once       # Poll once and exit   ║
+║    python scripts/push_sender.py --watch-subs # Follow sub changes   ║
+║    python scripts/push_sender.py --report     # Latency breakdown    ║
 ╚══════════════════════════════════════════════════════════════════════╝
 
 This script sends REAL push notifications that appear on:
@@ -24,10 +26,15 @@ It replaces the unreliable Vercel cron with a persistent background process.
 import os
 import sys
 import json
+import asyncio
 import time
 import signal
+import select
 import logging
+import threading
+import hashlib
 import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import Optional
@@ -44,7 +51,11 @@ try:
 except ImportError:
     print("⚠️  python-dotenv not installed, using system environment")
 
-import requests
+try:
+    from telegram_api import TelegramBot, TelegramAPIError
+except ImportError:
+    print("❌ httpx not installed. Run: pip install httpx")
+    sys.exit(1)
 
 try:
     from pywebpush import webpush, WebPushException
@@ -58,6 +69,19 @@ except ImportError:
     print("❌ supabase not installed. Run: pip install supabase")
     sys.exit(1)
 
+# Optional: resize/encode Telegram photos into notification images
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Optional: direct Postgres connection for the LISTEN/NOTIFY subscriber feed
+try:
+    import psycopg2
+    import psycopg2.extensions
+except ImportError:
+    psycopg2 = None
+
 
 # ─── CONFIGURATION ──────────────────────────────────────────────────
 
@@ -70,9 +94,44 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "") or os.getenv("NEXT_PUB
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 
+# Direct Postgres URL (Supabase → Settings → Database). Enables the realtime subscriber feed.
+SUPABASE_DB_URL = os.getenv("SUPABASE_DB_URL", "")
+
 # Polling interval in seconds (how often to check for new Telegram messages)
 POLL_INTERVAL = int(os.getenv("PUSH_POLL_INTERVAL", "30"))
 
+# How long the in-memory subscriber list is trusted before a full re-query.
+# Without the change feed this is the only way to see new subscribers, so keep it short.
+# With the feed running, the full refresh is just a periodic consistency check.
+SUBSCRIBER_CACHE_TTL = int(os.getenv("PUSH_SUBSCRIBER_CACHE_TTL", "60"))
+SUBSCRIBER_FEED_REFRESH = int(os.getenv("PUSH_SUBSCRIBER_FEED_REFRESH", "3600"))
+
+# NOTIFY channel fired by the trigger in sql/PUSH_NOTIFICATIONS_TABLE.sql
+SUBSCRIBER_FEED_CHANNEL = "push_subscriptions_changed"
+
+PUSH_CHANNELS = ("trades", "main", "shop", "vip")
+
+# Media posts (opt-in): Telegram photos are fetched once, resized to this width,
+# encoded as WebP, uploaded to this public Supabase Storage bucket and used as
+# the notification `image`. Create the bucket first (see the OPTIONAL storage
+# section of sql/PUSH_NOTIFICATIONS_TABLE.sql), then set PUSH_MEDIA_BUCKET=push-media.
+PUSH_MEDIA_BUCKET = os.getenv("PUSH_MEDIA_BUCKET", "")
+PUSH_IMAGE_WIDTH = int(os.getenv("PUSH_IMAGE_WIDTH", "720"))
+PUSH_IMAGE_QUALITY = int(os.getenv("PUSH_IMAGE_QUALITY", "75"))
+# How long a send may wait for a still-processing image (0 = never delay the alert)
+PUSH_IMAGE_WAIT = float(os.getenv("PUSH_IMAGE_WAIT", "0"))
+# A photo that failed (download, decode or upload) is not retried for this long
+PUSH_IMAGE_RETRY_AFTER = float(os.getenv("PUSH_IMAGE_RETRY_AFTER", str(6 * 3600)))
+MEDIA_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "push-media"
+
+# Counters the daemon keeps for `--status` (read without touching Supabase)
+PUSH_STATE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "push-state.json"
+
+# Per-message delivery-latency trace (one JSON object per line). "" disables it.
+PUSH_TRACE_FILE = os.getenv(
+    "PUSH_TRACE_FILE", str(Path(__file__).resolve().parent.parent / ".cache" / "push-trace.jsonl")
+)
+
 # Telegram channels to monitor (keyed by chat_username OR chat_id string)
 CHANNEL_MAP = {
     "bullmoneywebsite":  {"name": "FREE TRADES",      "channel": "trades", "priority": "high"},
@@ -105,11 +164,42 @@ def get_supabase() -> SupabaseClient:
 
 
 # ─── TELEGRAM POLLING ───────────────────────────────────────────────
+#
+# One pooled Bot API client and one event loop for the life of the process,
+# so every poll reuses the same keep-alive connection to api.telegram.org.
+# The loop runs on its own thread: the poller and the media worker both submit
+# to it and wait only for their own coroutine, so a photo download never holds
+# up a poll. _telegram_lock only guards creating the two.
 
 _last_update_id = 0
+_telegram: Optional[TelegramBot] = None
+_telegram_loop: Optional[asyncio.AbstractEventLoop] = None
+_telegram_lock = threading.Lock()
+
 
+def get_telegram() -> TelegramBot:
+    global _telegram
+    with _telegram_lock:
+        if _telegram is None:
+            _telegram = TelegramBot(TELEGRAM_BOT_TOKEN)
+        return _telegram
 
-def poll_telegram() -> list[dict]:
+
+def _get_telegram_loop() -> asyncio.AbstractEventLoop:
+    global _telegram_loop
+    with _telegram_lock:
+        if _telegram_loop is None:
+            _telegram_loop = asyncio.new_event_loop()
+            threading.Thread(target=_telegram_loop.run_forever, name="telegram-loop", daemon=True).start()
+        return _telegram_loop
+
+
+def run_telegram(coro):
+    """Run a Telegram coroutine on the shared loop from sync code (any thread) and wait for it."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_telegram_loop()).result()
+
+
+async def poll_telegram() -> list[dict]:
     """
     Poll Telegram Bot API for new channel_post updates.
     Returns list of new messages with metadata.
@@ -120,27 +210,23 @@ def poll_telegram() -> list[dict]:
         log.warning("TELEGRAM_BOT_TOKEN not set — skipping Telegram poll")
         return []
 
-    url = (
-        f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
-        f"?allowed_updates=[\"channel_post\",\"edited_channel_post\"]"
-        f"&limit=100"
-        f"&timeout=5"
-    )
-    if _last_update_id > 0:
-        url += f"&offset={_last_update_id + 1}"
-
+    bot = get_telegram()
     try:
-        resp = requests.get(url, timeout=15)
-        data = resp.json()
+        updates = await bot.get_updates(
+            allowed_updates=["channel_post", "edited_channel_post"],
+            limit=100,
+            timeout=5,
+            offset=_last_update_id + 1 if _last_update_id > 0 else None,
+        )
     except Exception as e:
         log.error(f"Telegram API error: {e}")
         return []
 
-    if not data.get("ok") or not data.get("result"):
+    if not updates:
         return []
 
     messages = []
-    for update in data["result"]:
+    for update in updates:
         _last_update_id = max(_last_update_id, update.get("update_id", 0))
 
         post = update.get("channel_post") or update.get("edited_channel_post")
@@ -153,6 +239,7 @@ def poll_telegram() -> list[dict]:
         chat_username = (post.get("chat") or {}).get("username", "")
         msg_id = post.get("message_id")
         msg_date = post.get("date", 0)
+        received_at = time.time()
 
         if not text and not has_media:
             continue
@@ -169,26 +256,170 @@ def poll_telegram() -> list[dict]:
             "telegram_message_id": msg_id,
             "message": text or ("📷 Media post" if has_media else ""),
             "has_media": has_media,
+            "photo": pick_photo_size(post) if has_media else None,
             "chat_title": chat_title,
             "chat_username": chat_username,
             "channel_info": channel_info,
             "created_at": datetime.fromtimestamp(msg_date, tz=timezone.utc).isoformat() if msg_date else datetime.now(timezone.utc).isoformat(),
+            "trace": {
+                # Edits are traced from the edit, not the original post
+                "posted": post.get("edit_date") or msg_date or received_at,
+                "received": received_at,
+            },
         })
 
     # Confirm updates processed
     if _last_update_id > 0 and messages:
         try:
-            requests.get(
-                f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates"
-                f"?offset={_last_update_id + 1}&limit=1",
-                timeout=5,
-            )
+            await bot.get_updates(offset=_last_update_id + 1, limit=1)
         except Exception:
             pass
 
     return messages
 
 
+# ─── MEDIA → NOTIFICATION IMAGE ─────────────────────────────────────
+#
+# Processing runs on one background worker so the text alert is never held up:
+# jobs start as soon as a poll returns, and the send only attaches the image
+# if it is already done (or within PUSH_IMAGE_WAIT). MEDIA_CACHE_DIR/index.json
+# maps Telegram's file_unique_id to the public URL — or to the time it failed,
+# so a broken photo is not fetched again for PUSH_IMAGE_RETRY_AFTER — and each
+# photo is fetched and encoded once, no matter how many subscribers or repeat
+# posts reference it. _media_jobs only holds jobs still in flight.
+
+_media_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="push-media")
+_media_jobs: dict[str, Future] = {}
+_media_lock = threading.Lock()
+_media_index: Optional[dict] = None
+
+
+def pick_photo_size(post: dict) -> Optional[dict]:
+    """
+    Smallest PhotoSize that still covers PUSH_IMAGE_WIDTH (else the largest).
+    Falls back to the thumbnail of videos, animations and documents.
+    """
+    sizes = post.get("photo") or []
+    if not sizes:
+        for key in ("video", "animation", "document"):
+            thumb = (post.get(key) or {}).get("thumbnail") or (post.get(key) or {}).get("thumb")
+            if thumb:
+                sizes = [thumb]
+                break
+    if not sizes:
+        return None
+
+    sizes = sorted(sizes, key=lambda s: s.get("width", 0))
+    best = next((s for s in sizes if s.get("width", 0) >= PUSH_IMAGE_WIDTH), sizes[-1])
+    return {"file_id": best["file_id"], "file_unique_id": best["file_unique_id"]}
+
+
+def _load_media_index() -> dict:
+    global _media_index
+    if _media_index is None:
+        try:
+            _media_index = json.loads((MEDIA_CACHE_DIR / "index.json").read_text())
+        except (OSError, ValueError):
+            _media_index = {}
+    return _media_index
+
+
+def _save_media_index():
+    MEDIA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = MEDIA_CACHE_DIR / "index.json.tmp"
+    tmp.write_text(json.dumps(_media_index, indent=2))
+    tmp.replace(MEDIA_CACHE_DIR / "index.json")
+
+
+def _encode_webp(raw: bytes) -> bytes:
+    from io import BytesIO
+    with Image.open(BytesIO(raw)) as img:
+        img = img.convert("RGB")
+        if img.width > PUSH_IMAGE_WIDTH:
+            img = img.resize((PUSH_IMAGE_WIDTH, round(img.height * PUSH_IMAGE_WIDTH / img.width)), Image.LANCZOS)
+        out = BytesIO()
+        img.save(out, "WEBP", quality=PUSH_IMAGE_QUALITY, method=4)
+        return out.getvalue()
+
+
+def _process_photo(photo: dict) -> Optional[str]:
+    """Worker: getFile → download → resize/WebP → upload. Returns the public URL."""
+    try:
+        return _upload_photo(photo)
+    except Exception as e:
+        with _media_lock:
+            _load_media_index()[photo["file_unique_id"]] = {"failed": time.time(), "error": str(e)[:200]}
+            _save_media_index()
+        raise
+
+
+def _upload_photo(photo: dict) -> str:
+    bot = get_telegram()
+
+    async def fetch() -> bytes:
+        info = await bot.get_file(photo["file_id"])
+        return await bot.download_file(info["file_path"])
+
+    webp = _encode_webp(run_telegram(fetch()))
+    digest = hashlib.sha256(webp).hexdigest()
+
+    # Content-addressed object name: identical images share one upload
+    storage = get_supabase().storage.from_(PUSH_MEDIA_BUCKET)
+    object_name = f"push/{digest}.webp"
+    storage.upload(object_name, webp, {"content-type": "image/webp", "upsert": "true"})
+    url = storage.get_public_url(object_name)
+
+    with _media_lock:
+        _load_media_index()[photo["file_unique_id"]] = {"sha256": digest, "url": url}
+        _save_media_index()
+    log.info(f"🖼️  Notification image ready: {len(webp) // 1024} KB → ...{url[-40:]}")
+    return url
+
+
+def start_media_job(msg: dict) -> Optional[Future]:
+    """Kick off (or reuse) image processing for a message's photo."""
+    photo = msg.get("photo")
+    if not photo or not PUSH_MEDIA_BUCKET or Image is None:
+        return None
+
+    key = photo["file_unique_id"]
+    with _media_lock:
+        job = _media_jobs.get(key)
+        if job is not None:
+            return job
+        cached = _load_media_index().get(key)
+        if cached and cached.get("url"):
+            job = Future()
+            job.set_result(cached["url"])
+            return job
+        if cached and time.time() - cached.get("failed", 0) < PUSH_IMAGE_RETRY_AFTER:
+            return None
+        job = _media_jobs[key] = _media_pool.submit(_process_photo, photo)
+    # Outside the lock: the callback runs inline if the job is already done
+    job.add_done_callback(lambda done: _forget_media_job(key, done))
+    return job
+
+
+def _forget_media_job(key: str, job: Future):
+    """Drop a finished job; successes are served from the index from now on."""
+    with _media_lock:
+        if _media_jobs.get(key) is job:
+            del _media_jobs[key]
+
+
+def media_image_url(msg: dict) -> Optional[str]:
+    """Image URL for the payload if processing has already finished (never raises)."""
+    job = start_media_job(msg)
+    if job is None:
+        return None
+    try:
+        return job.result(timeout=PUSH_IMAGE_WAIT)
+    except Exception as e:
+        if job.done():
+            log.warning(f"Notification image failed: {e}")
+        return None
+
+
 # ─── SAVE MESSAGES TO SUPABASE ──────────────────────────────────────
 
 def save_messages_to_db(messages: list[dict]) -> list[dict]:
@@ -215,6 +446,7 @@ def save_messages_to_db(messages: list[dict]) -> list[dict]:
                 continue
             # Exists but not notified — include it
             msg["db_id"] = existing.data[0]["id"]
+            mark_trace(msg, "saved")
             new_messages.append(msg)
             continue
 
@@ -232,33 +464,173 @@ def save_messages_to_db(messages: list[dict]) -> list[dict]:
 
         if result.data:
             msg["db_id"] = result.data[0]["id"]
+            mark_trace(msg, "saved")
+            note_inserted(msg)
             new_messages.append(msg)
 
     return new_messages
 
 
 # ─── GET PUSH SUBSCRIBERS ───────────────────────────────────────────
+#
+# Active subscriptions are kept in memory (endpoint → row) and filtered per
+# channel locally. The list is re-queried in full when it goes stale; when the
+# LISTEN/NOTIFY change feed is connected, inserts/updates/deletes are applied
+# as they happen and the full refresh only runs every SUBSCRIBER_FEED_REFRESH s.
+
+SUBSCRIBER_COLUMNS = "endpoint, p256dh, auth, " + ", ".join(f"channel_{c}" for c in PUSH_CHANNELS)
+
+_subscribers: dict[str, dict] = {}
+_subscribers_loaded_at = 0.0
+_subscribers_lock = threading.Lock()
+_feed_connected = threading.Event()
+
+
+def _replace_subscribers(rows: list[dict]):
+    global _subscribers_loaded_at
+    with _subscribers_lock:
+        _subscribers.clear()
+        for row in rows:
+            if row.get("endpoint"):
+                _subscribers[row["endpoint"]] = row
+        _subscribers_loaded_at = time.monotonic()
+    state_changed()
+
+
+def refresh_subscribers(force: bool = False):
+    """Re-query all active subscriptions if the cached list is stale."""
+    ttl = SUBSCRIBER_FEED_REFRESH if _feed_connected.is_set() else SUBSCRIBER_CACHE_TTL
+    if not force and _subscribers_loaded_at and time.monotonic() - _subscribers_loaded_at < ttl:
+        return
+
+    supabase = get_supabase()
+    result = supabase.table("push_subscriptions") \
+        .select(SUBSCRIBER_COLUMNS) \
+        .eq("is_active", True) \
+        .execute()
+    _replace_subscribers(result.data or [])
+
+
+def forget_subscriber(endpoint: str):
+    """Drop an endpoint from the in-memory list (e.g. after a 404/410 from the push service)."""
+    with _subscribers_lock:
+        _subscribers.pop(endpoint, None)
+    state_changed()
+
+
+def apply_subscription_change(change: dict):
+    """
+    Apply one change-feed event to the in-memory subscriber list.
+    Payload shape (see notify_push_subscriptions_change in the SQL file):
+      {"op": "INSERT"|"UPDATE"|"DELETE", "old_endpoint": str|null, "row": {...}}
+    """
+    op = change.get("op")
+    row = change.get("row") or {}
+
+    with _subscribers_lock:
+        old_endpoint = change.get("old_endpoint")
+        if old_endpoint:
+            _subscribers.pop(old_endpoint, None)
+
+        endpoint = row.get("endpoint")
+        if not endpoint:
+            return
+        if op == "DELETE" or not row.get("is_active"):
+            _subscribers.pop(endpoint, None)
+        else:
+            _subscribers[endpoint] = {k: row.get(k) for k in row if k != "is_active"}
+    state_changed()
+
 
 def get_subscribers(channel: str = "trades") -> list[dict]:
     """
-    Fetch all active push subscribers from Supabase.
-    Optionally filter by channel preference.
+    Return all active push subscribers opted in to the given channel.
+    Served from the in-memory list; re-queries Supabase only when stale.
     """
-    supabase = get_supabase()
+    refresh_subscribers()
     channel_col = f"channel_{channel}"
 
-    query = supabase.table("push_subscriptions") \
-        .select("endpoint, p256dh, auth") \
-        .eq("is_active", True)
+    with _subscribers_lock:
+        rows = list(_subscribers.values())
 
-    # Filter by channel preference
-    try:
-        query = query.eq(channel_col, True)
-    except Exception:
-        pass  # Column might not exist — send to all
+    # Unknown channel (no such column) — send to all
+    if channel not in PUSH_CHANNELS:
+        return rows
+    return [row for row in rows if row.get(channel_col) is True]
+
+
+# ─── SUBSCRIBER CHANGE FEED (Postgres LISTEN/NOTIFY) ────────────────
+
+def _load_subscribers_sql(conn):
+    """Full refresh over the feed's own connection (no REST round-trip)."""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT {SUBSCRIBER_COLUMNS} FROM public.push_subscriptions WHERE is_active = true")
+        cols = [d[0] for d in cur.description]
+        _replace_subscribers([dict(zip(cols, r)) for r in cur.fetchall()])
+
+
+def run_subscriber_feed(stop: threading.Event):
+    """
+    Keep the subscriber list in sync via LISTEN/NOTIFY until `stop` is set.
+    Reconnects with backoff; every (re)connect does a full refresh first so
+    nothing published while disconnected is missed.
+    """
+    backoff = 1
+
+    while not stop.is_set():
+        conn = None
+        try:
+            conn = psycopg2.connect(SUPABASE_DB_URL)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {SUBSCRIBER_FEED_CHANNEL};")
+
+            _load_subscribers_sql(conn)
+            _feed_connected.set()
+            state_changed()
+            backoff = 1
+            log.info(f"📻 Subscriber feed connected ({len(_subscribers)} active subscriptions)")
+
+            while not stop.is_set():
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    note = conn.notifies.pop(0)
+                    try:
+                        change = json.loads(note.payload)
+                    except ValueError:
+                        continue
+                    apply_subscription_change(change)
+                    log.info(f"📻 Subscriber feed: {change.get('op')} ...{(change.get('row') or {}).get('endpoint', '')[-30:]}")
+
+        except Exception as e:
+            log.warning(f"Subscriber feed error: {e} — retrying in {backoff}s")
+        finally:
+            _feed_connected.clear()
+            state_changed()
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
 
-    result = query.execute()
-    return result.data or []
+        stop.wait(backoff)
+        backoff = min(backoff * 2, 60)
+
+
+def start_subscriber_feed(stop: threading.Event) -> Optional[threading.Thread]:
+    """Start the change feed in a background thread, if configured."""
+    if not SUPABASE_DB_URL:
+        log.info("📻 Subscriber feed: off (set SUPABASE_DB_URL to enable)")
+        return None
+    if psycopg2 is None:
+        log.warning("📻 Subscriber feed: off (pip install psycopg2-binary to enable)")
+        return None
+
+    thread = threading.Thread(target=run_subscriber_feed, args=(stop,), name="subscriber-feed", daemon=True)
+    thread.start()
+    return thread
 
 
 # ─── SEND PUSH NOTIFICATION ─────────────────────────────────────────
@@ -303,6 +675,7 @@ def send_push(subscriber: dict, payload: dict) -> bool:
             code = status_code.status_code
             if code in (404, 410):
                 # Subscription expired — deactivate AND delete to keep DB clean
+                forget_subscriber(subscriber["endpoint"])
                 try:
                     supabase = get_supabase()
                     supabase.table("push_subscriptions") \
@@ -327,10 +700,11 @@ def send_push(subscriber: dict, payload: dict) -> bool:
         return False
 
 
-def send_push_to_all(subscribers: list[dict], payload: dict) -> tuple[int, int]:
+def send_push_to_all(subscribers: list[dict], payload: dict, trace: Optional[dict] = None) -> tuple[int, int]:
     """
     Send push notification to all subscribers.
     Returns (sent_count, failed_count).
+    If `trace` is given, records when the push service accepted the first and last send.
     """
     sent = 0
     failed = 0
@@ -338,6 +712,10 @@ def send_push_to_all(subscribers: list[dict], payload: dict) -> tuple[int, int]:
     for sub in subscribers:
         if send_push(sub, payload):
             sent += 1
+            if trace is not None:
+                now = time.time()
+                trace.setdefault("first_send", now)
+                trace["last_send"] = now
         else:
             failed += 1
 
@@ -386,7 +764,7 @@ def run_notification_cycle() -> dict:
 
     # Step 1: Poll Telegram
     log.info("📡 Polling Telegram for new messages...")
-    messages = poll_telegram()
+    messages = run_telegram(poll_telegram())
     stats["telegram_messages"] = len(messages)
 
     if messages:
@@ -395,6 +773,10 @@ def run_notification_cycle() -> dict:
         log.info("📭 No new messages")
         return stats
 
+    # Start image processing now so it overlaps the DB save and subscriber fetch
+    for msg in messages:
+        start_media_job(msg)
+
     # Step 2: Save to database & filter already-notified
     new_messages = save_messages_to_db(messages)
     stats["new_messages"] = len(new_messages)
@@ -416,6 +798,7 @@ def run_notification_cycle() -> dict:
 
         # Get subscribers for this channel
         subscribers = get_subscribers(channel)
+        mark_trace(msg, "subscribers")
         stats["subscribers"] = max(stats["subscribers"], len(subscribers))
 
         if not subscribers:
@@ -434,11 +817,15 @@ def run_notification_cycle() -> dict:
             "channel": channel,
             "requireInteraction": priority == "high",
         }
+        image_url = media_image_url(msg)
+        if image_url:
+            payload["image"] = image_url
 
         log.info(f"📤 Sending '{channel_name}' notification to {len(subscribers)} devices...")
-        sent, failed = send_push_to_all(subscribers, payload)
+        sent, failed = send_push_to_all(subscribers, payload, trace=msg.get("trace"))
         stats["sent"] += sent
         stats["failed"] += failed
+        write_trace(msg, channel, len(subscribers), sent, failed)
 
         log.info(f"   ✅ Sent: {sent}  ❌ Failed: {failed}")
 
@@ -447,19 +834,278 @@ def run_notification_cycle() -> dict:
 
     # Step 5: Mark as notified
     mark_as_notified(notified_ids)
+    note_notified(len(notified_ids))
 
     return stats
 
 
+# ─── DAEMON STATE (for --status) ────────────────────────────────────
+#
+# The three exact counts in check_status are expensive on a large vip_messages
+# table (the unnotified one is a sequential scan). The daemon takes them once
+# at startup, then keeps them current from what it inserts and notifies.
+# Every change (a message inserted or notified, a subscriber-feed event, a
+# finished cycle) marks the state dirty, and a writer thread saves it to
+# PUSH_STATE_FILE at most once per STATE_WRITE_INTERVAL — the rate
+# `--status --watch` redraws at. `--status` reads that file when the daemon is
+# alive; `--status --watch` never queries Supabase.
+
+STATE_WRITE_INTERVAL = 1.0
+
+_state = {
+    "unnotified": 0,
+    "recent_posted": [],   # post timestamps of messages inserted in the last hour
+    "baseline": False,
+    "started_at": time.time(),
+    "sent_total": 0,
+    "failed_total": 0,
+    "cycles": 0,
+    "last_cycle": {},
+}
+_state_lock = threading.Lock()
+_state_dirty = threading.Event()
+
+
+def init_state():
+    """One-time baseline counts at daemon startup."""
+    try:
+        refresh_subscribers(force=True)
+        supabase = get_supabase()
+        result = supabase.table("vip_messages") \
+            .select("id", count="exact") \
+            .or_("notification_sent.is.null,notification_sent.eq.false") \
+            .execute()
+        _state["unnotified"] = result.count if result.count is not None else len(result.data or [])
+
+        one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+        result = supabase.table("vip_messages") \
+            .select("created_at") \
+            .gte("created_at", one_hour_ago.isoformat()) \
+            .execute()
+        _state["recent_posted"] = [
+            datetime.fromisoformat(r["created_at"].replace("Z", "+00:00")).timestamp()
+            for r in result.data or [] if r.get("created_at")
+        ]
+        _state["baseline"] = True
+    except Exception as e:
+        log.warning(f"Could not take baseline counts for --status: {e}")
+
+
+def state_changed():
+    _state_dirty.set()
+
+
+def note_inserted(msg: dict):
+    with _state_lock:
+        _state["unnotified"] += 1
+        _state["recent_posted"].append((msg.get("trace") or {}).get("posted") or time.time())
+    state_changed()
+
+
+def note_notified(count: int):
+    with _state_lock:
+        _state["unnotified"] = max(0, _state["unnotified"] - count)
+    state_changed()
+
+
+def note_cycle(cycle_count: int, stats: dict):
+    with _state_lock:
+        _state["cycles"] = cycle_count
+        _state["last_cycle"] = stats
+        _state["sent_total"] += stats.get("sent", 0)
+        _state["failed_total"] += stats.get("failed", 0)
+    state_changed()
+
+
+def run_state_writer(stop: threading.Event):
+    """Save the state whenever it changed, at most once per STATE_WRITE_INTERVAL."""
+    while not stop.is_set():
+        if _state_dirty.wait(STATE_WRITE_INTERVAL):
+            _state_dirty.clear()
+            write_state()
+            stop.wait(STATE_WRITE_INTERVAL)
+    if _state_dirty.is_set():
+        write_state()
+
+
+def write_state():
+    cutoff = time.time() - 3600
+    with _state_lock:
+        _state["recent_posted"] = [t for t in _state["recent_posted"] if t >= cutoff]
+        snapshot = {**_state, "recent_posted": list(_state["recent_posted"])}
+
+    with _subscribers_lock:
+        rows = list(_subscribers.values())
+    payload = {
+        **snapshot,
+        "pid": os.getpid(),
+        "updated_at": time.time(),
+        "poll_interval": POLL_INTERVAL,
+        "feed_connected": _feed_connected.is_set(),
+        "subscribers": len(rows),
+        "subscribers_by_channel": {c: sum(1 for r in rows if r.get(f"channel_{c}") is True) for c in PUSH_CHANNELS},
+    }
+    try:
+        PUSH_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = PUSH_STATE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, indent=2))
+        tmp.replace(PUSH_STATE_FILE)
+    except OSError as e:
+        log.warning(f"Could not write state file: {e}")
+
+
+def read_state() -> Optional[dict]:
+    """Daemon state if the file exists and the daemon updated it recently."""
+    try:
+        state = json.loads(PUSH_STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return None
+    max_age = max(3 * state.get("poll_interval", POLL_INTERVAL), 90)
+    state["age"] = time.time() - state.get("updated_at", 0)
+    state["alive"] = state["age"] <= max_age
+    return state
+
+
+def print_cached_counts(state: dict):
+    cutoff = time.time() - 3600
+    recent = sum(1 for t in state.get("recent_posted", []) if t >= cutoff)
+    by_channel = "  ".join(f"{c}={n}" for c, n in state.get("subscribers_by_channel", {}).items())
+    log.info(f"  📱 Active subscribers: {state.get('subscribers', 0)}  ({by_channel})")
+    log.info(f"  💬 Messages (last hour): {recent}")
+    log.info(f"  🔔 Unnotified messages: {state.get('unnotified', 0)}"
+             + ("" if state.get("baseline") else "  (since daemon start)"))
+    log.info(f"  📤 Sent / failed since start: {state.get('sent_total', 0)} / {state.get('failed_total', 0)}")
+    log.info(f"  📻 Subscriber feed: {'connected' if state.get('feed_connected') else 'off'}")
+
+
+def watch_status():
+    """Redraw the daemon's cached counters as often as the daemon writes them (no Supabase queries)."""
+    try:
+        while True:
+            state = read_state()
+            sys.stdout.write("\033[H\033[J")
+            sys.stdout.flush()
+            log.info(f"📊 PUSH SENDER STATUS  —  {datetime.now().strftime('%H:%M:%S')}  (Ctrl+C to exit)")
+            log.info("=" * 50)
+            if state is None:
+                log.warning(f"  No daemon state at {PUSH_STATE_FILE} — is the daemon running?")
+            else:
+                if state["alive"]:
+                    log.info(f"  🟢 Daemon pid {state.get('pid')}  cycle #{state.get('cycles')}  updated {state['age']:.0f}s ago")
+                else:
+                    log.warning(f"  🔴 Daemon state is stale ({state['age']:.0f}s old) — daemon not running?")
+                print_cached_counts(state)
+            time.sleep(STATE_WRITE_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+
+
+# ─── DELIVERY-LATENCY TRACING ───────────────────────────────────────
+#
+# Each notified message gets one JSONL record with wall-clock timestamps for:
+#   posted → received (poll) → saved (DB) → subscribers (fetched)
+#          → first_send → last_send (push service accepted)
+# `--report` turns the file into a per-stage latency breakdown.
+
+TRACE_STAGES = [
+    ("telegram",    "posted",      "received"),
+    ("db_save",     "received",    "saved"),
+    ("subscribers", "saved",       "subscribers"),
+    ("first_send",  "subscribers", "first_send"),
+    ("fan_out",     "first_send",  "last_send"),
+    ("total",       "posted",      "last_send"),
+]
+
+
+def mark_trace(msg: dict, stage: str):
+    if "trace" in msg:
+        msg["trace"][stage] = time.time()
+
+
+def write_trace(msg: dict, channel: str, subscribers: int, sent: int, failed: int):
+    if not PUSH_TRACE_FILE or "trace" not in msg:
+        return
+    record = {
+        "telegram_message_id": msg.get("telegram_message_id"),
+        "channel": channel,
+        "has_media": msg.get("has_media", False),
+        "subscribers": subscribers,
+        "sent": sent,
+        "failed": failed,
+        **{k: round(v, 3) for k, v in msg["trace"].items()},
+    }
+    try:
+        path = Path(PUSH_TRACE_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        log.warning(f"Could not write trace: {e}")
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def print_trace_report():
+    """Print the per-stage latency breakdown from the trace file."""
+    path = Path(PUSH_TRACE_FILE) if PUSH_TRACE_FILE else None
+    if not path or not path.exists():
+        log.warning(f"No trace file at {PUSH_TRACE_FILE or '(disabled)'} — run the daemon first")
+        return
+
+    records = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+
+    log.info("⏱️  PUSH DELIVERY LATENCY")
+    log.info("=" * 62)
+    log.info(f"  {len(records)} traced message(s) from {path}")
+    log.info("  (Telegram post dates have 1 s resolution, so 'telegram' is ±1 s)")
+    log.info("")
+    log.info(f"  {'stage':<12} {'n':>5} {'p50':>9} {'p90':>9} {'max':>9} {'share':>7}")
+    log.info(f"  {'─' * 56}")
+
+    medians = {}
+    rows = []
+    for name, start, end in TRACE_STAGES:
+        durations = [r[end] - r[start] for r in records if start in r and end in r]
+        if not durations:
+            rows.append((name, 0, None, None, None))
+            continue
+        medians[name] = _percentile(durations, 50)
+        rows.append((name, len(durations), medians[name], _percentile(durations, 90), max(durations)))
+
+    total = medians.get("total") or 0
+    for name, n, p50, p90, worst in rows:
+        if p50 is None:
+            log.info(f"  {name:<12} {n:>5} {'—':>9} {'—':>9} {'—':>9}")
+            continue
+        share = f"{p50 / total * 100:5.1f}%" if total and name != "total" else ""
+        log.info(f"  {name:<12} {n:>5} {p50:>8.2f}s {p90:>8.2f}s {worst:>8.2f}s {share:>7}")
+
+    stages = {k: v for k, v in medians.items() if k != "total"}
+    if stages:
+        slowest = max(stages, key=stages.get)
+        log.info("")
+        log.info(f"  🐢 Slowest stage (median): {slowest} — {stages[slowest]:.2f}s")
+
+
 # ─── DAEMON MODE ─────────────────────────────────────────────────────
 
 _running = True
+_stop_event = threading.Event()
 
 
 def signal_handler(signum, frame):
     global _running
     log.info("\n🛑 Shutting down push sender...")
     _running = False
+    _stop_event.set()
 
 
 def run_daemon():
@@ -481,6 +1127,11 @@ def run_daemon():
         log.error("   Set NEXT_PUBLIC_VAPID_PUBLIC_KEY and VAPID_PRIVATE_KEY in .env.local")
         sys.exit(1)
 
+    start_subscriber_feed(_stop_event)
+    init_state()
+    state_writer = threading.Thread(target=run_state_writer, args=(_stop_event,), name="push-state", daemon=True)
+    state_writer.start()
+
     cycle_count = 0
 
     while _running:
@@ -488,6 +1139,7 @@ def run_daemon():
         log.info(f"\n{'─' * 40}")
         log.info(f"🔄 Cycle #{cycle_count} at {datetime.now().strftime('%H:%M:%S')}")
 
+        stats = {}
         try:
             stats = run_notification_cycle()
 
@@ -501,12 +1153,15 @@ def run_daemon():
         except Exception as e:
             log.error(f"❌ Cycle error: {e}", exc_info=True)
 
+        note_cycle(cycle_count, stats)
+
         # Wait for next cycle
         for _ in range(POLL_INTERVAL):
             if not _running:
                 break
             time.sleep(1)
 
+    state_writer.join(timeout=5)  # signal_handler set _stop_event: final write
     log.info("👋 Push sender stopped")
 
 
@@ -556,30 +1211,8 @@ def run_test():
 
 # ─── STATUS CHECK ────────────────────────────────────────────────────
 
-def check_status():
-    """Check the notification system status."""
-    log.info("📊 PUSH NOTIFICATION SYSTEM STATUS")
-    log.info("=" * 50)
-
-    # Config check
-    checks = {
-        "VAPID Public Key":   bool(VAPID_PUBLIC_KEY),
-        "VAPID Private Key":  bool(VAPID_PRIVATE_KEY),
-        "Supabase URL":       bool(SUPABASE_URL),
-        "Supabase Key":       bool(SUPABASE_KEY),
-        "Telegram Bot Token": bool(TELEGRAM_BOT_TOKEN),
-    }
-
-    for name, ok in checks.items():
-        icon = "✅" if ok else "❌"
-        log.info(f"  {icon} {name}")
-
-    all_ok = all(checks.values())
-    if not all_ok:
-        log.error("\n❌ Some configuration is missing! Check .env.local")
-        return
-
-    # Database check
+def check_database_counts():
+    """Exact counts straight from Supabase (used when no daemon is running)."""
     log.info("\n📡 Database check...")
     try:
         supabase = get_supabase()
@@ -612,16 +1245,45 @@ def check_status():
     except Exception as e:
         log.error(f"  ❌ Database error: {e}")
 
+
+def check_status():
+    """Check the notification system status."""
+    log.info("📊 PUSH NOTIFICATION SYSTEM STATUS")
+    log.info("=" * 50)
+
+    # Config check
+    checks = {
+        "VAPID Public Key":   bool(VAPID_PUBLIC_KEY),
+        "VAPID Private Key":  bool(VAPID_PRIVATE_KEY),
+        "Supabase URL":       bool(SUPABASE_URL),
+        "Supabase Key":       bool(SUPABASE_KEY),
+        "Telegram Bot Token": bool(TELEGRAM_BOT_TOKEN),
+    }
+
+    for name, ok in checks.items():
+        icon = "✅" if ok else "❌"
+        log.info(f"  {icon} {name}")
+
+    all_ok = all(checks.values())
+    if not all_ok:
+        log.error("\n❌ Some configuration is missing! Check .env.local")
+        return
+
+    # Running daemon keeps the counts — no need to hit the database
+    state = read_state()
+    if state and state["alive"]:
+        log.info(f"\n📡 Daemon counters (pid {state.get('pid')}, updated {state['age']:.0f}s ago)...")
+        print_cached_counts(state)
+    else:
+        check_database_counts()
+
     # Telegram check
     log.info("\n🤖 Telegram check...")
     try:
-        resp = requests.get(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getMe", timeout=5)
-        bot_info = resp.json()
-        if bot_info.get("ok"):
-            bot = bot_info["result"]
-            log.info(f"  ✅ Bot: @{bot.get('username', 'unknown')} ({bot.get('first_name', '')})")
-        else:
-            log.error(f"  ❌ Bot token invalid: {bot_info.get('description', 'Unknown error')}")
+        bot = run_telegram(get_telegram().get_me())
+        log.info(f"  ✅ Bot: @{bot.get('username', 'unknown')} ({bot.get('first_name', '')})")
+    except TelegramAPIError as e:
+        log.error(f"  ❌ Bot token invalid: {e}")
     except Exception as e:
         log.error(f"  ❌ Telegram error: {e}")
 
@@ -716,6 +1378,30 @@ def cleanup_subscriptions():
     log.info(f"📱 Remaining active: {alive}")
 
 
+# ─── WATCH SUBSCRIBER FEED ──────────────────────────────────────────
+
+def watch_subscriptions():
+    """
+    Run only the LISTEN/NOTIFY subscriber feed and log every change.
+    Useful for checking the trigger against a local Postgres:
+      SUPABASE_DB_URL=postgresql://localhost/postgres python scripts/push_sender.py --watch-subs
+    """
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if start_subscriber_feed(_stop_event) is None:
+        return
+
+    last_counts = None
+    while not _stop_event.wait(2):
+        with _subscribers_lock:
+            rows = list(_subscribers.values())
+        counts = {c: sum(1 for r in rows if r.get(f"channel_{c}") is True) for c in PUSH_CHANNELS}
+        if counts != last_counts and _feed_connected.is_set():
+            log.info(f"📱 Active: {len(rows)}  " + "  ".join(f"{c}={n}" for c, n in counts.items()))
+            last_counts = counts
+
+
 # ─── ENTRY POINT ─────────────────────────────────────────────────────
 
 def main():
@@ -727,25 +1413,35 @@ Examples:
   python scripts/push_sender.py              # Run daemon (polls Telegram every 30s)
   python scripts/push_sender.py --test       # Send test push to all subscribers
   python scripts/push_sender.py --status     # Check system health
+  python scripts/push_sender.py --status --watch  # Live daemon counters (no DB queries)
   python scripts/push_sender.py --once       # Run one cycle and exit
+  python scripts/push_sender.py --watch-subs # Follow the subscriber change feed
+  python scripts/push_sender.py --report     # Delivery-latency breakdown per stage
   python scripts/push_sender.py --send "🚀 BTC Long Entry" "Entry: 95000, TP: 100000"
         """,
     )
     parser.add_argument("--test", action="store_true", help="Send a test notification")
     parser.add_argument("--status", action="store_true", help="Check system status")
+    parser.add_argument("--watch", action="store_true", help="With --status: redraw the daemon's counters every second")
     parser.add_argument("--once", action="store_true", help="Run one poll cycle and exit")
     parser.add_argument("--cleanup", action="store_true", help="Test & remove dead subscriptions")
+    parser.add_argument("--watch-subs", action="store_true", help="Follow the LISTEN/NOTIFY subscriber feed and log changes")
+    parser.add_argument("--report", action="store_true", help="Print delivery-latency breakdown from the trace file")
     parser.add_argument("--send", nargs=2, metavar=("TITLE", "BODY"), help="Send custom notification")
     parser.add_argument("--channel", default="trades", help="Channel for --send (trades/main/shop/vip)")
     parser.add_argument("--interval", type=int, default=None, help="Override poll interval (seconds)")
 
     args = parser.parse_args()
+    if args.watch and not args.status:
+        parser.error("--watch only works with --status (python scripts/push_sender.py --status --watch)")
 
     global POLL_INTERVAL
     if args.interval:
         POLL_INTERVAL = args.interval
 
-    if args.status:
+    if args.status and args.watch:
+        watch_status()
+    elif args.status:
         check_status()
     elif args.test:
         run_test()
@@ -754,6 +1450,10 @@ Examples:
         log.info(f"📊 Results: {json.dumps(stats, indent=2)}")
     elif args.cleanup:
         cleanup_subscriptions()
+    elif args.watch_subs:
+        watch_subscriptions()
+    elif args.report:
+        print_trace_report()
     elif args.send:
         send_custom(args.send[0], args.send[1], channel=args.channel)
     else:
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Shared async Telegram Bot API client for the scripts in this folder.
+
+One pooled httpx.AsyncClient per bot, consistent timeouts, and retry with
+exponential backoff on network errors, 5xx and 429 (honouring retry_after).
+
+    from telegram_api import TelegramBot, TelegramAPIError
+
+    async with TelegramBot(token) as bot:
+        me = await bot.call("getMe")
+        updates = await bot.get_updates(offset=42, timeout=5)
+
+httpx ships with supabase-py, so anything that already talks to Supabase
+has it installed. Otherwise: pip install httpx
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from typing import Any
+
+import httpx
+
+API_BASE = "https://api.telegram.org"
+
+# Seconds. Long-poll calls (getUpdates with timeout=N) get N added to the read timeout.
+DEFAULT_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 5.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+
+class TelegramAPIError(Exception):
+    """Telegram answered ok=false (bad token, chat not found, ...). Not retried."""
+
+    def __init__(self, method: str, description: str, error_code: int | None = None) -> None:
+        super().__init__(description)
+        self.method = method
+        self.description = description
+        self.error_code = error_code
+
+
+class TelegramBot:
+    def __init__(
+        self,
+        token: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_connections: int = 10,
+    ) -> None:
+        self.token = token
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._client = httpx.AsyncClient(
+            base_url=f"{API_BASE}/bot{token}/",
+            timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self) -> TelegramBot:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _delay(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after:
+            return min(float(retry_after), MAX_BACKOFF)
+        return min(self.backoff * (2 ** attempt), MAX_BACKOFF) * (0.5 + random.random() / 2)
+
+    async def call(self, method: str, **params: Any) -> Any:
+        """
+        Call a Bot API method and return its `result`.
+        List/dict params (e.g. allowed_updates) are JSON-encoded as Telegram expects.
+        Raises TelegramAPIError on ok=false, httpx.HTTPError once retries are exhausted.
+        """
+        query = {
+            k: json.dumps(v) if isinstance(v, (list, dict)) else v
+            for k, v in params.items() if v is not None
+        }
+        long_poll = float(params.get("timeout") or 0) if method == "getUpdates" else 0.0
+        timeout = httpx.Timeout(self.timeout + long_poll, connect=CONNECT_TIMEOUT)
+
+        attempt = 0
+        while True:
+            try:
+                resp = await self._client.get(method, params=query, timeout=timeout)
+                data = resp.json()
+            except (httpx.TransportError, ValueError):
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                attempt += 1
+                continue
+
+            if data.get("ok"):
+                return data.get("result")
+
+            code = data.get("error_code") or resp.status_code
+            retryable = code == 429 or code >= 500
+            if not retryable or attempt >= self.retries:
+                raise TelegramAPIError(method, data.get("description", "unknown error"), code)
+            retry_after = (data.get("parameters") or {}).get("retry_after")
+            await asyncio.sleep(self._delay(attempt, retry_after))
+            attempt += 1
+
+    # ── Convenience wrappers ─────────────────────────────────────────
+
+    async def get_me(self) -> dict:
+        return await self.call("getMe")
+
+    async def get_updates(self, **params: Any) -> list[dict]:
+        return await self.call("getUpdates", **params) or []
+
+    async def get_webhook_info(self) -> dict:
+        return await self.call("getWebhookInfo")
+
+    async def set_webhook(self, url: str, **params: Any) -> bool:
+        return await self.call("setWebhook", url=url, **params)
+
+    async def delete_webhook(self, drop_pending_updates: bool = False) -> bool:
+        return await self.call("deleteWebhook", drop_pending_updates=drop_pending_updates)
+
+    async def get_chat(self, chat_id: str | int) -> dict:
+        return await self.call("getChat", chat_id=chat_id)
+
+    async def get_chat_member(self, chat_id: str | int, user_id: int) -> dict:
+        return await self.call("getChatMember", chat_id=chat_id, user_id=user_id)
+
+    async def get_file(self, file_id: str) -> dict:
+        return await self.call("getFile", file_id=file_id)
+
+    async def download_file(self, file_path: str) -> bytes:
+        """Download a file_path returned by getFile (same pooled connection, same retries)."""
+        url = f"{API_BASE}/file/bot{self.token}/{file_path}"
+        attempt = 0
+        while True:
+            try:
+                resp = await self._client.get(url)
+                if resp.status_code < 500:
+                    resp.raise_for_status()
+                    return resp.content
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+            else:
+                if attempt >= self.retries:
+                    resp.raise_for_status()
+            await asyncio.sleep(self._delay(attempt))
+            attempt += 1
@@ -1,52 +1,64 @@
 #!/usr/bin/env python3
 """Deep Telegram diagnostic — check bot permissions and channel access"""
-import requests, os, json
+import os, json, asyncio
 from dotenv import load_dotenv
 from pathlib import Path
+from telegram_api import TelegramBot, TelegramAPIError
 
 load_dotenv(Path(__file__).resolve().parent.parent / ".env.local")
 token = os.getenv("TELEGRAM_BOT_TOKEN", "")
 
-# 1. Get ALL updates with full detail
-print("=== ALL UPDATES (raw) ===")
-r = requests.get(
-    f"https://api.telegram.org/bot{token}/getUpdates?limit=10&timeout=2",
-    timeout=10
-)
-data = r.json()
-for u in data.get("result", []):
-    print(json.dumps(u, indent=2, ensure_ascii=False)[:500])
-    print("---")
-
-# 2. Check the specific channels
 channels = ["@bullmoneywebsite", "@bullmoneyfx", "@bullmoneyshop"]
-print("\n=== CHANNEL ACCESS CHECK ===")
-for ch in channels:
+
+
+async def check_chat(bot: TelegramBot, ch: str) -> str:
     try:
-        r2 = requests.get(f"https://api.telegram.org/bot{token}/getChat?chat_id={ch}", timeout=5)
-        info = r2.json()
-        if info.get("ok"):
-            chat = info["result"]
-            print(f"  {ch}: {chat.get('title','?')} (type: {chat.get('type','?')}, id: {chat.get('id','?')})")
-        else:
-            print(f"  {ch}: FAILED - {info.get('description','unknown error')}")
+        chat = await bot.get_chat(ch)
+        return f"  {ch}: {chat.get('title','?')} (type: {chat.get('type','?')}, id: {chat.get('id','?')})"
+    except TelegramAPIError as e:
+        return f"  {ch}: FAILED - {e}"
     except Exception as e:
-        print(f"  {ch}: ERROR - {e}")
+        return f"  {ch}: ERROR - {e}"
 
-# 3. Check bot membership in channels
-print("\n=== BOT MEMBERSHIP CHECK ===")
-bot_r = requests.get(f"https://api.telegram.org/bot{token}/getMe")
-bot_id = bot_r.json().get("result", {}).get("id")
-print(f"Bot ID: {bot_id}")
 
-for ch in channels:
+async def check_member(bot: TelegramBot, ch: str, bot_id) -> str:
     try:
-        r3 = requests.get(f"https://api.telegram.org/bot{token}/getChatMember?chat_id={ch}&user_id={bot_id}", timeout=5)
-        member = r3.json()
-        if member.get("ok"):
-            status = member["result"].get("status", "?")
-            print(f"  {ch}: status = {status}")
-        else:
-            print(f"  {ch}: NOT A MEMBER - {member.get('description','?')}")
+        member = await bot.get_chat_member(ch, bot_id)
+        return f"  {ch}: status = {member.get('status', '?')}"
+    except TelegramAPIError as e:
+        return f"  {ch}: NOT A MEMBER - {e}"
     except Exception as e:
-        print(f"  {ch}: ERROR - {e}")
+        return f"  {ch}: ERROR - {e}"
+
+
+async def main():
+    async with TelegramBot(token) as bot:
+        # Updates, bot identity and every channel lookup run concurrently
+        updates, me, *chat_lines = await asyncio.gather(
+            bot.get_updates(limit=10, timeout=2),
+            bot.get_me(),
+            *(check_chat(bot, ch) for ch in channels),
+            return_exceptions=True,
+        )
+
+        # 1. Get ALL updates with full detail
+        print("=== ALL UPDATES (raw) ===")
+        for u in (updates if isinstance(updates, list) else []):
+            print(json.dumps(u, indent=2, ensure_ascii=False)[:500])
+            print("---")
+
+        # 2. Check the specific channels
+        print("\n=== CHANNEL ACCESS CHECK ===")
+        for line in chat_lines:
+            print(line)
+
+        # 3. Check bot membership in channels (needs the bot id from getMe)
+        print("\n=== BOT MEMBERSHIP CHECK ===")
+        bot_id = me.get("id") if isinstance(me, dict) else None
+        print(f"Bot ID: {bot_id}")
+
+        for line in await asyncio.gather(*(check_member(bot, ch, bot_id) for ch in channels)):
+            print(line)
+
+
+asyncio.run(main())
@@ -0,0 +1,247 @@
+#!/usr/bin/env node
+/**
+ * BULLMONEY tsc daemon
+ *
+ * Long-lived type checker for clean.py. Keeps the TypeScript program, the
+ * parsed lib files and the semantic diagnostics of every file in memory, so
+ * a check after an edit only re-parses the files whose mtime changed and
+ * only re-checks the files affected by them — no Node start-up, no lib
+ * parsing, no program construction from scratch.
+ *
+ * Listens on 127.0.0.1 (random port) and writes .bullclean/tsc-daemon.json
+ * ({ pid, port, token, typescript }). Requests and replies are one JSON
+ * object per line:
+ *
+ *   { "token": "…", "cmd": "check" }                  → all diagnostics
+ *   { "token": "…", "cmd": "check", "files": [...], "since": N }
+ *                                                     → only what changed
+ *   { "token": "…", "cmd": "ping" } / { …, "cmd": "stop" }
+ *
+ * A check replies { ok, output, errors, files, checked, generation, partial,
+ * scope, ms }: `output` is formatted exactly like `tsc --noEmit`, `checked`
+ * lists the files whose diagnostics were recomputed and `generation` numbers
+ * the check. When `since` is the generation of the previous check (so the
+ * caller holds the full result of it), the reply is `partial`: it carries
+ * only the diagnostics of `files`, of every re-checked file and the global
+ * ones, and `scope` lists the files it covers. Any other file's diagnostics
+ * are unchanged since generation `since`. Exits after 30 idle minutes
+ * (BULLCLEAN_TSC_IDLE_MINUTES).
+ *
+ * The program is built in the background shortly after start-up. A build
+ * blocks the event loop, so a ping sent meanwhile is answered only once it
+ * is done: clients treat a live pid in the state file as started.
+ *
+ * Started and stopped by clean.py:
+ *   python3 scripts/clean.py --apply --tsc-daemon
+ *   python3 scripts/clean.py --tsc-daemon-stop
+ */
+
+import crypto from 'crypto';
+import fs from 'fs';
+import net from 'net';
+import path from 'path';
+import { createRequire } from 'module';
+import { fileURLToPath } from 'url';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+const rootDir = path.resolve(__dirname, '..');
+
+const STATE_FILE = path.join(rootDir, '.bullclean', 'tsc-daemon.json');
+const IDLE_MS = Number(process.env.BULLCLEAN_TSC_IDLE_MINUTES || 30) * 60_000;
+const WARM_DELAY_MS = 500;
+
+// The project's own TypeScript, same as node_modules/.bin/tsc
+const ts = createRequire(path.join(rootDir, 'package.json'))('typescript');
+
+const formatHost = {
+  getCanonicalFileName: (f) => f,
+  getCurrentDirectory: () => rootDir,
+  getNewLine: () => ts.sys.newLine,
+};
+
+// ═══════════════════════════════════════════════════════════════════════════
+// PROGRAM STATE
+// ═══════════════════════════════════════════════════════════════════════════
+
+/** fileName → { mtime, sourceFile }; unchanged files hand back the same object so the program is reused */
+const sourceCache = new Map();
+let optionsKey = '';
+let host = null;
+let builder;
+let generation = 0;
+
+function readConfig() {
+  const configPath = ts.findConfigFile(rootDir, ts.sys.fileExists, 'tsconfig.json');
+  if (!configPath) throw new Error(`no tsconfig.json in ${rootDir}`);
+  const { config, error } = ts.readConfigFile(configPath, ts.sys.readFile);
+  if (error) throw new Error(ts.formatDiagnostics([error], formatHost));
+  // Re-parsed on every check so files added or removed since the last one are picked up
+  return ts.parseJsonConfigFileContent(config, ts.sys, rootDir, { noEmit: true }, configPath);
+}
+
+function createHost(options) {
+  const compilerHost = ts.createCompilerHost(options, true);
+  const readSourceFile = compilerHost.getSourceFile;
+  compilerHost.getSourceFile = (fileName, languageVersion, onError, shouldCreate) => {
+    const mtime = ts.sys.getModifiedTime?.(fileName)?.getTime() ?? 0;
+    const hit = sourceCache.get(fileName);
+    if (hit && hit.mtime === mtime) return hit.sourceFile;
+    const sourceFile = readSourceFile(fileName, languageVersion, onError, shouldCreate);
+    if (sourceFile) {
+      // The builder compares versions to find changed files
+      sourceFile.version = ts.sys.createHash ? ts.sys.createHash(sourceFile.text) : String(mtime);
+      sourceCache.set(fileName, { mtime, sourceFile });
+    }
+    return sourceFile;
+  };
+  return compilerHost;
+}
+
+function check(files, since) {
+  const start = Date.now();
+  const partial = Array.isArray(files) && since === generation;
+  generation += 1;
+  const parsed = readConfig();
+
+  const key = JSON.stringify(parsed.options);
+  if (key !== optionsKey) {
+    // Compiler options changed (or first check): nothing cached is valid
+    sourceCache.clear();
+    builder = undefined;
+    host = createHost(parsed.options);
+    optionsKey = key;
+  }
+
+  builder = ts.createSemanticDiagnosticsBuilderProgram(
+    parsed.fileNames, parsed.options, host, builder,
+    ts.getConfigFileParsingDiagnostics(parsed), parsed.projectReferences,
+  );
+
+  // Only files affected by a change are re-checked; the rest come from the previous check
+  const checked = [];
+  for (let next; (next = builder.getSemanticDiagnosticsOfNextAffectedFile());) {
+    if (next.affected.fileName) checked.push(path.relative(rootDir, next.affected.fileName));
+  }
+
+  const live = new Set(builder.getProgram().getSourceFiles().map((f) => f.fileName));
+  for (const fileName of sourceCache.keys()) {
+    if (!live.has(fileName)) sourceCache.delete(fileName);
+  }
+
+  let diagnostics = ts.sortAndDeduplicateDiagnostics([
+    ...builder.getConfigFileParsingDiagnostics(),
+    ...builder.getOptionsDiagnostics(),
+    ...builder.getGlobalDiagnostics(),
+    ...builder.getSyntacticDiagnostics(),
+    ...builder.getSemanticDiagnostics(),
+  ]);
+  // A partial reply covers the requested files plus everything re-checked
+  let scope = [];
+  if (partial) {
+    const requested = files.map((f) => path.relative(rootDir, path.resolve(rootDir, f)));
+    scope = [...new Set([...requested, ...checked])];
+    const wanted = new Set(scope.map((f) => path.resolve(rootDir, f)));
+    diagnostics = diagnostics.filter((d) => !d.file || wanted.has(path.resolve(d.file.fileName)));
+  }
+
+  return {
+    output: ts.formatDiagnostics(diagnostics, formatHost),
+    errors: diagnostics.filter((d) => d.category === ts.DiagnosticCategory.Error).length,
+    files: parsed.fileNames.length,
+    checked,
+    generation,
+    partial,
+    scope,
+    ms: Date.now() - start,
+  };
+}
+
+// ═══════════════════════════════════════════════════════════════════════════
+// SERVER
+// ═══════════════════════════════════════════════════════════════════════════
+
+const token = crypto.randomBytes(16).toString('hex');
+let idleTimer = null;
+let warmTimer = null;
+
+function resetIdleTimer() {
+  clearTimeout(idleTimer);
+  idleTimer = setTimeout(shutdown, IDLE_MS);
+  idleTimer.unref();
+}
+
+function reply(socket, payload) {
+  socket.write(JSON.stringify(payload) + '\n');
+}
+
+function handle(line, socket) {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch {
+    return reply(socket, { ok: false, error: 'bad request' });
+  }
+  if (request.token !== token) return reply(socket, { ok: false, error: 'bad token' });
+  resetIdleTimer();
+
+  switch (request.cmd) {
+    case 'ping':
+      return reply(socket, { ok: true, pid: process.pid, typescript: ts.version, generation });
+    case 'check':
+      clearTimeout(warmTimer);  // this check builds the program itself
+      try {
+        return reply(socket, { ok: true, ...check(request.files, request.since) });
+      } catch (err) {
+        return reply(socket, { ok: false, error: String(err?.message || err) });
+      }
+    case 'stop':
+      reply(socket, { ok: true });
+      return socket.end(shutdown);
+    default:
+      return reply(socket, { ok: false, error: `unknown cmd ${request.cmd}` });
+  }
+}
+
+const server = net.createServer((socket) => {
+  let buffer = '';
+  socket.setEncoding('utf8');
+  socket.on('data', (chunk) => {
+    buffer += chunk;
+    for (let nl; (nl = buffer.indexOf('\n')) !== -1;) {
+      const line = buffer.slice(0, nl);
+      buffer = buffer.slice(nl + 1);
+      if (line.trim()) handle(line, socket);
+    }
+  });
+  socket.on('error', () => {});
+});
+
+function shutdown() {
+  try {
+    // Only remove the state file if it still describes this process
+    if (JSON.parse(fs.readFileSync(STATE_FILE, 'utf8')).pid === process.pid) fs.unlinkSync(STATE_FILE);
+  } catch {}
+  server.close();
+  process.exit(0);
+}
+
+process.on('SIGINT', shutdown);
+process.on('SIGTERM', shutdown);
+
+server.listen(0, '127.0.0.1', () => {
+  const state = { pid: process.pid, port: server.address().port, token, typescript: ts.version };
+  fs.mkdirSync(path.dirname(STATE_FILE), { recursive: true });
+  const tmp = `${STATE_FILE}.${process.pid}.tmp`;
+  fs.writeFileSync(tmp, JSON.stringify(state), { mode: 0o600 });
+  fs.renameSync(tmp, STATE_FILE);
+  resetIdleTimer();
+  // Build the program once start-up has settled, unless a check asks first:
+  // the state file is already written, so clients know the daemon is up
+  warmTimer = setTimeout(() => {
+    if (generation > 0) return;
+    try {
+      check();
+    } catch {}
+  }, WARM_DELAY_MS);
+});
@@ -104,6 +104,51 @@ CREATE TRIGGER update_push_subscriptions_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- ============================================================================
+-- OPTIONAL: Change feed for scripts/push_sender.py (LISTEN/NOTIFY)
+-- Every insert/update/delete publishes the subscription on the
+-- push_subscriptions_changed channel so the sender can keep its in-memory
+-- subscriber list in sync without re-querying the table.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION notify_push_subscriptions_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    rec RECORD;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    -- Keep the payload small (NOTIFY is capped at 8000 bytes): no user_agent
+    PERFORM pg_notify('push_subscriptions_changed', json_build_object(
+        'op', TG_OP,
+        'old_endpoint', CASE WHEN TG_OP = 'UPDATE' AND OLD.endpoint IS DISTINCT FROM NEW.endpoint
+                             THEN OLD.endpoint END,
+        'row', json_build_object(
+            'endpoint', rec.endpoint,
+            'p256dh', rec.p256dh,
+            'auth', rec.auth,
+            'is_active', rec.is_active,
+            'channel_trades', rec.channel_trades,
+            'channel_main', rec.channel_main,
+            'channel_shop', rec.channel_shop,
+            'channel_vip', rec.channel_vip
+        )
+    )::text);
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS push_subscriptions_notify ON public.push_subscriptions;
+CREATE TRIGGER push_subscriptions_notify
+    AFTER INSERT OR UPDATE OR DELETE ON public.push_subscriptions
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_push_subscriptions_change();
+
 -- ============================================================================
 -- GRANT PERMISSIONS (adjust based on your setup)
 -- ============================================================================
@@ -116,3 +161,14 @@ GRANT ALL ON public.push_subscriptions TO service_role;
 GRANT ALL ON public.notification_history TO anon;
 GRANT ALL ON public.notification_history TO authenticated;
 GRANT ALL ON public.notification_history TO service_role;
+
+-- ============================================================================
+-- OPTIONAL: Storage bucket for notification images (scripts/push_sender.py)
+-- Only needed with PUSH_MEDIA_BUCKET=push-media: photos from media posts are
+-- resized, uploaded here by the sender (service role key) and shown as the
+-- notification image. Public so push services and browsers can fetch them.
+-- ============================================================================
+
+INSERT INTO storage.buckets (id, name, public, allowed_mime_types)
+VALUES ('push-media', 'push-media', true, ARRAY['image/webp'])
+ON CONFLICT (id) DO NOTHING;